@@ -0,0 +1,120 @@
+"""
+Benchmarks the shared Transport against plain `requests.get` calls.
+
+A local stand-in server simulates a data source: fixed latency per request,
+a server-side rate limit answered with 429 + Retry-After, random 503s, and
+ETag revalidation. Each client fetches the same set of series URLs twice
+(a cold sync, then a warm one) from a thread pool.
+
+Usage:
+    python scripts/benchmark_transport.py [--requests 200] [--workers 8]
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from market_monitor.data.transport import RetryPolicy, Transport
+
+BODY = b"DATE,VALUE\n" + b"".join(f"2000-01-{d:02d},{d}.0\n".encode() for d in range(1, 29)) * 200
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.02
+    failure_rate = 0.05
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if not self.server.admit():
+            self._reply(429, b"", {"Retry-After": "1"})
+        elif random.random() < self.failure_rate:
+            self._reply(503, b"")
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self._reply(304, b"", {"ETag": '"v1"'})
+        else:
+            self._reply(200, BODY, {"ETag": '"v1"'})
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, rate: float, burst: int):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.rate, self.burst = rate, burst
+        self._tokens, self._updated = float(burst), time.monotonic()
+        self._lock = threading.Lock()
+
+    def admit(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def run(fetch, urls, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    ok = sum(status == 200 for status in statuses)
+    return elapsed, ok, len(statuses) - ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per sync")
+    parser.add_argument("--workers", type=int, default=8, help="Client threads")
+    parser.add_argument("--server-rate", type=float, default=100.0, help="Server rate limit (req/s)")
+    args = parser.parse_args()
+
+    server = StandInServer(rate=args.server_rate, burst=10)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/series/{i}.csv" for i in range(args.requests)]
+
+    def naive(url):
+        try:
+            return requests.get(url, timeout=10).status_code
+        except requests.RequestException:
+            return -1
+
+    transport = Transport(
+        default_rate_limit=(args.server_rate * 0.9, 10.0),
+        policy=RetryPolicy(max_retries=6, backoff_base=0.05, backoff_max=2.0),
+    )
+
+    def pooled(url):
+        return transport.session.get(url, timeout=10).status_code
+
+    print(f"{'CLIENT':<22} {'SYNC':<5} {'SECONDS':>8} {'OK':>5} {'FAILED':>7} {'REQ/S':>7}")
+    for name, fetch in [("requests.get", naive), ("Transport", pooled)]:
+        for sync in ("cold", "warm"):
+            elapsed, ok, failed = run(fetch, urls, args.workers)
+            print(f"{name:<22} {sync:<5} {elapsed:>8.2f} {ok:>5} {failed:>7} {ok / elapsed:>7.1f}")
+
+    transport.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
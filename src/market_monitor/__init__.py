@@ -1,8 +1,8 @@
 """
 Extremistan package.
 
-Provides the quantitative risk analytics, data adapters, strategy logic, and
+Provides the quantitative risk analytics, data adapters, pipeline engine, and
 UI layers for the tail-risk monitoring toolkit.
 """
 
-__all__ = ["analytics", "data", "strategy", "ui"]
+__all__ = ["analytics", "core", "data", "ui"]
@@ -2,7 +2,9 @@
 Analytics utilities for Extremistan.
 
 This module exposes statistical primitives such as log-return calculation and
-Hill estimator implementations used throughout the strategy stack.
+Hill plot diagnostics (`tail`) used throughout the strategy stack, plus
+rolling robust-scale estimators for regime-aware thresholds, rolling
+cross-asset correlations, and an out-of-core streaming path.
 """
 
-__all__ = ["math_lib"]
+__all__ = ["correlation", "math_lib", "robust_scale", "streaming", "tail"]
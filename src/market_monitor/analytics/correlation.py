@@ -0,0 +1,208 @@
+"""
+Rolling cross-asset covariance and correlation.
+
+Co-movement is measured over aligned panels (one column per series) with
+pairwise-complete observations, like ``pd.DataFrame.rolling(...).corr``.
+Window sums are taken as differences of cumulative sums instead of being
+recomputed per window, and the panel is processed in blocks of columns and
+chunks of rows so memory stays bounded for universes of thousands of series.
+"""
+import warnings
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ("cov", "corr")
+
+
+def _block_moments(
+    x: np.ndarray,
+    y: np.ndarray,
+    window: int,
+    min_periods: int,
+    start: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling covariance and correlation for every (x column, y column) pair.
+
+    Outputs are produced for rows ``start`` onwards; the preceding
+    ``window - 1`` rows are only used to seed the cumulative sums.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: cov and corr, shaped (rows, bx, by).
+    """
+    lo = max(0, start - window + 1)
+    x = x[lo:]
+    y = y[lo:]
+
+    mx = ~np.isnan(x)
+    my = ~np.isnan(y)
+    # Covariance is shift invariant; centering each chunk first keeps the
+    # cumulative sums small and avoids cancellation in Sxy - Sx*Sy/n.
+    with warnings.catch_warnings():
+        # All-NaN columns ("Mean of empty slice") shift by zero.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        shift_x = np.nan_to_num(np.nanmean(x, axis=0))
+        shift_y = np.nan_to_num(np.nanmean(y, axis=0))
+    x0 = np.where(mx, x - shift_x, 0.0)
+    y0 = np.where(my, y - shift_y, 0.0)
+    mxf = mx.astype(float)[:, :, None]
+    myf = my.astype(float)[:, None, :]
+    x0 = x0[:, :, None]
+    y0 = y0[:, None, :]
+
+    rows = np.arange(start - lo, len(x))
+    end_idx = rows + 1
+    start_idx = np.maximum(rows - window + 1, 0)
+
+    def window_sum(values: np.ndarray) -> np.ndarray:
+        cs = np.cumsum(values, axis=0)
+        cs = np.concatenate([np.zeros((1,) + cs.shape[1:]), cs])
+        return cs[end_idx] - cs[start_idx]
+
+    count = window_sum(mxf * myf)
+    sx = window_sum(x0 * myf)
+    sy = window_sum(mxf * y0)
+    sxy = window_sum(x0 * y0)
+    sxx = window_sum(x0 * x0 * myf)
+    syy = window_sum(mxf * y0 * y0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = (sxy - sx * sy / count) / (count - 1)
+        var_x = (sxx - sx * sx / count) / (count - 1)
+        var_y = (syy - sy * sy / count) / (count - 1)
+        corr = cov / np.sqrt(var_x * var_y)
+
+    insufficient = count < min_periods
+    cov[insufficient] = np.nan
+    corr[insufficient | (var_x <= 0) | (var_y <= 0)] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return cov, corr
+
+
+def rolling_pairwise_moments(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    window: int,
+    min_periods: Optional[int] = None,
+    chunk_rows: int = 2048,
+    start: int = 0,
+    symmetric: bool = False,
+) -> pd.DataFrame:
+    """
+    Rolling covariance and correlation between every column of ``left`` and
+    every column of ``right``.
+
+    Args:
+        left: Aligned panel (e.g. log returns), one column per series.
+        right: Panel sharing ``left``'s index.
+        window: Window length in rows.
+        min_periods: Minimum pairwise-complete observations. Defaults to
+            ``window``.
+        chunk_rows: Rows processed per chunk; bounds the working set to
+            roughly ``(chunk_rows + window) * len(left.columns) * len(right.columns)``.
+        start: First row position to emit. Earlier rows are only read to seed
+            the window, which is how incremental updates extend a result.
+        symmetric: ``left`` and ``right`` are the same block; only the pairs
+            above the diagonal are emitted.
+
+    Returns:
+        pd.DataFrame: Index from ``left`` (rows ``start`` onwards), columns
+                      MultiIndex (statistic, left, right) with statistic in
+                      ``('cov', 'corr')``.
+    """
+    if window < 2:
+        raise ValueError(f"window must be at least 2, got {window}")
+    if not left.index.equals(right.index):
+        raise ValueError("left and right panels must share the same index")
+    min_periods = window if min_periods is None else max(min_periods, 2)
+
+    x = left.to_numpy(dtype=float)
+    y = right.to_numpy(dtype=float)
+    if symmetric:
+        ii, jj = np.triu_indices(x.shape[1], k=1)
+    else:
+        ii, jj = np.divmod(np.arange(x.shape[1] * y.shape[1]), y.shape[1])
+
+    covs: List[np.ndarray] = []
+    corrs: List[np.ndarray] = []
+    for chunk_start in range(start, len(x), chunk_rows):
+        chunk_end = min(chunk_start + chunk_rows, len(x))
+        cov, corr = _block_moments(
+            x[:chunk_end], y[:chunk_end], window, min_periods, chunk_start
+        )
+        covs.append(cov[:, ii, jj])
+        corrs.append(corr[:, ii, jj])
+
+    pairs = list(zip(left.columns[ii], right.columns[jj]))
+    columns = pd.MultiIndex.from_tuples(
+        [(stat, a, b) for stat in STATISTICS for a, b in pairs],
+        names=["statistic", "left", "right"],
+    )
+    if covs:
+        values = np.hstack([np.vstack(covs), np.vstack(corrs)])
+    else:
+        values = np.empty((0, len(columns)))
+    return pd.DataFrame(values, index=left.index[start:], columns=columns)
+
+
+def block_key(window: int, left_block: int, right_block: int) -> str:
+    """Storage key for one block pair of a rolling correlation run."""
+    return f"rolling_corr_w{window}_{left_block:04d}_{right_block:04d}"
+
+
+def iter_column_blocks(
+    panel: pd.DataFrame,
+    block_size: int,
+) -> Iterator[Tuple[Tuple[int, int], pd.DataFrame, pd.DataFrame]]:
+    """
+    Yields the column blocks of ``panel`` pairwise (upper triangle).
+
+    Blocks are formed from the column order, so the universe order must be
+    stable across runs for stored results to line up. A trailing single-column
+    block holds no pairs on its own and is only yielded against other blocks.
+
+    Yields:
+        ((left_block, right_block), left_panel, right_panel)
+    """
+    n_blocks = -(-panel.shape[1] // block_size)
+    for bi in range(n_blocks):
+        left = panel.iloc[:, bi * block_size:(bi + 1) * block_size]
+        for bj in range(bi, n_blocks):
+            if bi == bj and left.shape[1] < 2:
+                continue
+            right = panel.iloc[:, bj * block_size:(bj + 1) * block_size]
+            yield (bi, bj), left, right
+
+
+def rolling_correlation_blocks(
+    panel: pd.DataFrame,
+    window: int,
+    block_size: int = 32,
+    min_periods: Optional[int] = None,
+    chunk_rows: int = 2048,
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Rolling covariance/correlation for every pair of columns in ``panel``,
+    one block pair at a time.
+
+    Args:
+        panel: Aligned panel (e.g. log returns), one column per series.
+        window: Window length in rows.
+        block_size: Columns per block; each yielded frame holds at most
+            ``block_size ** 2`` pairs.
+        min_periods: Minimum pairwise-complete observations.
+        chunk_rows: Rows processed per chunk inside a block.
+
+    Yields:
+        Tuple[str, pd.DataFrame]: The block's storage key and its result, in
+                                  the layout of :func:`rolling_pairwise_moments`.
+    """
+    for (bi, bj), left, right in iter_column_blocks(panel, block_size):
+        yield block_key(window, bi, bj), rolling_pairwise_moments(
+            left, right, window,
+            min_periods=min_periods,
+            chunk_rows=chunk_rows,
+            symmetric=(bi == bj),
+        )
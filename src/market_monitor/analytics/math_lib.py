@@ -1,5 +1,9 @@
 import numpy as np
 import pandas as pd
+from typing import Sequence
+
+# Outlier tiers, in multiples of the lifetime MAD
+MAD_TIERS = (5, 7, 10)
 
 def get_log_returns(series: pd.Series) -> pd.Series:
     """
@@ -15,3 +19,20 @@ def calculate_drawdown(series: pd.Series) -> pd.Series:
     """
     high_water_mark = series.expanding().max()
     return (series / high_water_mark) - 1
+
+def classify_mad_tiers(
+    log_returns: pd.Series,
+    lifetime_mad: float,
+    tiers: Sequence[int] = MAD_TIERS
+) -> pd.Series:
+    """
+    Classifies each move by the largest MAD tier it exceeds.
+    Returns a signed integer Series: +10 for a move above +10 MAD, -5 for a
+    move below -5 MAD (but not -7), 0 for normal days.
+    """
+    tier = pd.Series(0, index=log_returns.index, dtype=int)
+    for level in sorted(tiers):
+        threshold = level * lifetime_mad
+        tier[log_returns > threshold] = level
+        tier[log_returns < -threshold] = -level
+    return tier
@@ -0,0 +1,482 @@
+"""
+Rolling and exponentially weighted scale estimators.
+
+The lifetime sigma/MAD anchors treat a century of returns as a single regime.
+These estimators score each observation against a trailing, regime-aware
+baseline instead:
+
+* Rolling mean absolute deviation (the rolling analogue of the lifetime MAD).
+* Rolling median and rolling median absolute deviation.
+* Exponentially weighted mean absolute deviation.
+
+The rolling estimators are vectorized over time, one numpy pass per block of
+windows instead of a Python loop per row. Windows of up to 128 rows are
+sorted row by row. Longer ones are answered from a wavelet matrix built once
+per column (O(n log n)): the k-th smallest value of any window, and the count
+and sum of its values below a threshold, take one O(log n) descent whatever
+the window length, and every window length is queried in the same batch. The
+median is read off by rank, the mean absolute deviation follows from the
+count and sum below the mean, and the median absolute deviation from a binary
+search over the two sorted halves of the deviations, narrowed by the result
+of a nearby row. Window sums come from compensated prefix sums, so a large
+level earlier in the history does not swamp later windows. `rolling_robust_scales`
+computes all three at once; `scripts/benchmark_robust_scale.py` compares it
+with pandas `rolling.apply`, a `sliding_window_view` implementation and
+pandas' native `rolling.median`.
+"""
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+SeriesOrFrame = Union[pd.Series, pd.DataFrame]
+
+STATISTICS = ("mean_ad", "median", "median_ad")
+
+# Windows up to this length are sorted row by row (SIMD sort); longer ones are queried in a wavelet matrix
+_SORT_WINDOW = 128
+# Elements (rows x window length) of sorted windows per block, and wavelet queries (rows x windows) per block
+_BLOCK_ELEMENTS = 1 << 22
+_BLOCK_QUERIES = 1 << 18
+# Rows whose median absolute deviation is searched in full (every 64th), then refined from the nearest one found
+_REFINE_STRIDES = (64, 8, 1)
+_UNBOUNDED = np.iinfo(np.int64).max
+
+
+def _prefix_sums(values: np.ndarray):
+    """
+    Prefix sums of ``values`` with their rounding errors: ``(hi, lo)``, both of length n + 1.
+
+    ``np.cumsum`` adds sequentially, so the error of every addition is
+    recovered exactly (TwoSum) and summed separately; a range sum
+    ``(hi[b] - hi[a]) + (lo[b] - lo[a])`` then keeps the small values that
+    follow a large one.
+    """
+    running = np.cumsum(values)
+    previous = np.concatenate([[0.0], running[:-1]])
+    added = running - previous
+    errors = (previous - (running - added)) + (values - added)
+    return np.concatenate([[0.0], running]), np.concatenate([[0.0], np.cumsum(errors)])
+
+
+def _range_sums(prefix, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    hi, lo = prefix
+    return (hi[stop] - hi[start]) + (lo[stop] - lo[start])
+
+
+class _WaveletMatrix:
+    """
+    Order statistics over any range of rows of one column, for many ranges at once.
+
+    Each value is replaced by its rank in the sorted column (ties by position,
+    NaNs last) and the ranks are stored bit by bit, most significant first,
+    each level stably partitioned on its bit (a wavelet matrix). The k-th
+    smallest value of a range, and the count (and sum) of its values ranked
+    below a threshold, are then found by one descent through the log2(n)
+    levels, whatever the length of the range; every query takes arrays of
+    ranges and descends for all of them together.
+
+    Args:
+        values: One column (finite or NaN).
+        sums: Also keep per-level prefix sums of the values, for `below`.
+    """
+    def __init__(self, values: np.ndarray, sums: bool = False):
+        n = len(values)
+        order = np.argsort(values, kind='stable')
+        self.values = values[order]
+        self.valid = n - int(np.isnan(values).sum())
+        self.levels = n.bit_length()
+        self.zeros = []  # Per level: zero bits among the first i entries
+        self.sums = []  # Per level: prefix sums of the values with a zero bit
+        current = np.empty(n, dtype=np.int64)
+        current[order] = np.arange(n)
+        for level in reversed(range(self.levels)):
+            is_zero = ((current >> level) & 1) == 0
+            self.zeros.append(np.concatenate([[0], np.cumsum(is_zero)]))
+            if sums:
+                self.sums.append(_prefix_sums(np.where(is_zero & (current < self.valid), self.values[current], 0.0)))
+            current = np.concatenate([current[is_zero], current[~is_zero]])
+
+    def rank(self, value: np.ndarray, side: str = 'left') -> np.ndarray:
+        """How many values of the column lie below ``value`` (or at or below it, 'right')."""
+        return np.searchsorted(self.values[:self.valid], value, side=side)
+
+    @staticmethod
+    def _descend(zeros, one, start, stop, zeros_start, zeros_stop):
+        """The range on the next level: zero bits move to the front, one bits after all of them."""
+        return (np.where(one, start + (zeros[-1] - zeros_start), zeros_start),
+                np.where(one, stop + (zeros[-1] - zeros_stop), zeros_stop))
+
+    def kth(self, start: np.ndarray, stop: np.ndarray, k: np.ndarray) -> np.ndarray:
+        """The k-th smallest (0-based) value of each range ``[start, stop)``."""
+        rank = np.zeros(len(k), dtype=np.int64)
+        for zeros, level in zip(self.zeros, reversed(range(self.levels))):
+            zeros_start, zeros_stop = zeros.take(start), zeros.take(stop)
+            count = zeros_stop - zeros_start
+            one = k >= count
+            rank |= one.astype(np.int64) << level
+            k = k - count * one
+            start, stop = self._descend(zeros, one, start, stop, zeros_start, zeros_stop)
+        return self.values[rank]
+
+    def below(self, start: np.ndarray, stop: np.ndarray, threshold: np.ndarray, sums: bool = False):
+        """The count (and, with ``sums``, the sum) of the values of each range ranked below ``threshold``."""
+        count = np.zeros(len(start), dtype=np.int64)
+        total = np.zeros(len(start))
+        for i, (zeros, level) in enumerate(zip(self.zeros, reversed(range(self.levels)))):
+            zeros_start, zeros_stop = zeros.take(start), zeros.take(stop)
+            one = ((threshold >> level) & 1) == 1
+            # Ranks with a zero bit here are all below the threshold
+            count += (zeros_stop - zeros_start) * one
+            if sums:
+                total += np.where(one, _range_sums(self.sums[i], start, stop), 0.0)
+            start, stop = self._descend(zeros, one, start, stop, zeros_start, zeros_stop)
+        return (count, total) if sums else count
+
+
+class _WaveletWindows:
+    """Windows ``[start, stop)`` of one column, answered by descents through a `_WaveletMatrix`."""
+    def __init__(self, matrix: _WaveletMatrix, start: np.ndarray, stop: np.ndarray):
+        self.matrix = matrix
+        self.start = start
+        self.stop = stop
+
+    def value(self, rank: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """The value ranked ``rank`` (0-based) in each window of ``rows``; +inf out of range."""
+        start, stop = self.start[rows], self.stop[rows]
+        inside = (rank >= 0) & (rank < stop - start)
+        return np.where(inside, self.matrix.kth(start, stop, np.clip(rank, 0, np.maximum(stop - start - 1, 0))), np.inf)
+
+    def below(self, value: np.ndarray, rows: np.ndarray, side: str = 'left', sums: bool = False):
+        """The count (and sum) of the values of each window of ``rows`` below ``value`` (at or below, 'right')."""
+        return self.matrix.below(self.start[rows], self.stop[rows], self.matrix.rank(value, side), sums)
+
+
+class _SortedWindows:
+    """Short windows (rows x w) sorted row by row, NaNs last; order statistics are plain indexing."""
+    def __init__(self, windows: np.ndarray):
+        self.sorted = np.sort(windows, axis=-1)
+        self.w = windows.shape[-1]
+
+    def value(self, rank: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        inside = (rank >= 0) & (rank < self.w)
+        return np.where(inside, self.sorted[rows, np.clip(rank, 0, self.w - 1)], np.inf)
+
+    def below(self, value: np.ndarray, rows: np.ndarray, side: str = 'left', sums: bool = False):
+        windows = self.sorted[rows]
+        is_below = windows < value[:, None] if side == 'left' else windows <= value[:, None]
+        count = is_below.sum(axis=-1)
+        return (count, np.sum(windows, axis=-1, where=is_below)) if sums else count
+
+
+def _kth_deviation(windows, rows: np.ndarray, center, split, count, k, lo, hi):
+    """
+    The k-th and (k+1)-th smallest (0-based) |x - center| of the windows of ``rows``.
+
+    Values ranked below ``split`` give deviations that grow leftwards, the
+    rest give deviations that grow rightwards; both sequences are sorted, so
+    the k-th element of their merge is found by a binary search over how many
+    are taken from the left, within ``[lo, hi]``, run for all windows at once
+    (windows drop out as they converge). Also returns whether each result is
+    consistent, which it is unless ``[lo, hi]`` excluded the answer.
+    """
+    def left(i, j):
+        return np.where(j < split[i], center[i] - windows.value(split[i] - 1 - j, rows[i]), np.inf)
+
+    def right(i, j):
+        return np.where(j < count[i] - split[i], windows.value(split[i] + j, rows[i]) - center[i], np.inf)
+
+    take = k + 1
+    lo = np.maximum(lo, np.maximum(0, take - (count - split)))
+    hi = np.minimum(hi, np.minimum(split, take))
+    active = np.flatnonzero(lo < hi)
+    while len(active):
+        i = (lo[active] + hi[active]) // 2
+        # Taking too few from the left: the next left deviation beats the last right one taken
+        too_few = left(active, i) < right(active, take[active] - i - 1)
+        lo[active] = np.where(too_few, i + 1, lo[active])
+        hi[active] = np.where(too_few, hi[active], i)
+        active = active[lo[active] < hi[active]]
+
+    every = np.arange(len(rows))
+    i = lo
+    j = take - i
+    last_left = np.where(i > 0, left(every, i - 1), -np.inf)
+    last_right = np.where(j > 0, right(every, j - 1), -np.inf)
+    next_left, next_right = left(every, i), right(every, j)
+    consistent = (last_left <= next_right) & (last_right <= next_left)
+    return np.maximum(last_left, last_right), np.minimum(next_left, next_right), consistent
+
+
+def _median_abs_deviation(windows, center, split, count, position) -> np.ndarray:
+    """
+    Median absolute deviation of every window, given the medians.
+
+    A full binary search over the split of a window costs O(log w) order
+    statistics. Every 64th row is searched in full; the others count the
+    values within the deviation found for a nearby row (8 rows, then 1 row,
+    apart), which brackets their split to the few values between the two
+    deviations. A bracket that turns out wrong falls back to the full search.
+
+    ``position`` is the row of each window in the column; blocks start at a
+    multiple of 64 rows, so the row ``position % stride`` earlier is always
+    in the block.
+    """
+    k = (count - 1) // 2
+    out = np.full(len(count), np.nan)
+    done = np.zeros(len(count), dtype=bool)
+    previous = None
+    for stride in _REFINE_STRIDES:
+        rows = np.flatnonzero((position % stride == 0) & ~done)
+        take = k[rows] + 1
+        lo = np.zeros(len(rows), dtype=np.int64)
+        hi = np.full(len(rows), _UNBOUNDED)
+        if previous is not None:
+            estimate = out[rows - position[rows] % previous]
+            within_left = split[rows] - windows.below(center[rows] - estimate, rows)
+            within_right = windows.below(center[rows] + estimate, rows, 'right') - split[rows]
+            # Enough values within the estimate: the split takes at most those
+            enough = within_left + within_right >= take
+            known = np.isfinite(estimate)
+            lo = np.where(known, np.where(enough, take - within_right, within_left), lo)
+            hi = np.where(known, np.where(enough, within_left, take - within_right), hi)
+
+        kth, following, consistent = _kth_deviation(windows, rows, center[rows], split[rows], count[rows], k[rows], lo, hi)
+        retry = np.flatnonzero(~consistent)
+        if len(retry):
+            kth[retry], following[retry], _ = _kth_deviation(
+                windows, rows[retry], center[rows[retry]], split[rows[retry]], count[rows[retry]], k[rows[retry]],
+                np.zeros(len(retry), dtype=np.int64), np.full(len(retry), _UNBOUNDED))
+        out[rows] = np.where(count[rows] % 2, kth, 0.5 * (kth + following))
+        done[rows] = True
+        previous = stride
+    return out
+
+
+def _window_scales(windows, count, total, position, statistics: Sequence[str]) -> Dict[str, np.ndarray]:
+    """The statistics of a block of windows, given their counts, sums and rows."""
+    out = {}
+    rows = np.arange(len(count))
+    safe_count = np.maximum(count, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if "mean_ad" in statistics:
+            # sum|x - mean| = (total - 2 * sum below) - mean * (count - 2 * count below)
+            mean = total / safe_count
+            below, below_sum = windows.below(mean, rows, sums=True)
+            out["mean_ad"] = ((total - 2 * below_sum) - mean * (safe_count - 2 * below)) / safe_count
+
+        if "median" in statistics or "median_ad" in statistics:
+            lower = windows.value((safe_count - 1) // 2, rows)
+            center = np.where(safe_count % 2, lower, 0.5 * (lower + windows.value(safe_count // 2, rows)))
+            out["median"] = center
+
+        if "median_ad" in statistics:
+            split = windows.below(center, rows)
+            out["median_ad"] = _median_abs_deviation(windows, center, split, safe_count, position)
+    return out
+
+
+def _rolling_scales(
+    values: np.ndarray,
+    windows: Sequence[int],
+    min_periods: Optional[int],
+    statistics: Sequence[str],
+) -> Dict[str, np.ndarray]:
+    """
+    Rolling statistics of one column for every window length (rows x windows).
+
+    NaNs occupy a slot in the window but are not counted, and so do +-inf
+    (e.g. the log return off a zero price), mirroring ``pd.Series.rolling``;
+    neither affects any other window.
+    """
+    n = len(values)
+    out = {stat: np.full((n, len(windows)), np.nan) for stat in statistics}
+    if n == 0:
+        return out
+
+    values = np.where(np.isinf(values), np.nan, values)
+    valid = np.concatenate([[0], np.cumsum(~np.isnan(values))])
+    totals = _prefix_sums(np.nan_to_num(values))
+
+    def store(columns, first, block_rows, size, scales):
+        stop = np.tile(np.arange(first, first + block_rows), len(columns)) + 1
+        count = valid[stop] - valid[np.maximum(0, stop - size)]
+        required = size if min_periods is None else np.minimum(max(min_periods, 1), size)
+        for stat in statistics:
+            result = np.where(count >= required, scales[stat], np.nan)
+            out[stat][first:first + block_rows, columns] = result.reshape(len(columns), -1).T
+
+    # Short windows: each block of windows sorted once, row by row
+    padded = np.concatenate([np.full(max(windows) - 1, np.nan), values])
+    for column, w in enumerate(windows):
+        if w > _SORT_WINDOW:
+            continue
+        block = max(64, _BLOCK_ELEMENTS // w // 64 * 64)
+        for first in range(0, n, block):
+            position = np.arange(first, min(n, first + block))
+            stop = position + 1
+            lead = len(padded) - n  # Padding ahead of row 0
+            sorted_windows = _SortedWindows(sliding_window_view(padded[lead + first - w + 1:lead + stop[-1]], w))
+            count = valid[stop] - valid[np.maximum(0, stop - w)]
+            total = _range_sums(totals, np.maximum(0, stop - w), stop)
+            store([column], first, len(position), w, _window_scales(sorted_windows, count, total, position, statistics))
+
+    # Long windows: one wavelet matrix per column, queried for all of them together
+    columns = [column for column, w in enumerate(windows) if w > _SORT_WINDOW]
+    if not columns:
+        return out
+    matrix = _WaveletMatrix(values, sums="mean_ad" in statistics)
+    sizes = np.array([windows[column] for column in columns])
+    block = max(64, _BLOCK_QUERIES // len(columns) // 64 * 64)
+    for first in range(0, n, block):
+        rows = min(n, first + block) - first
+        position = np.tile(np.arange(first, first + rows), len(columns))
+        size = np.repeat(sizes, rows)
+        stop = position + 1
+        start = np.maximum(0, stop - size)
+        scales = _window_scales(_WaveletWindows(matrix, start, stop), valid[stop] - valid[start],
+                                _range_sums(totals, start, stop), position, statistics)
+        store(columns, first, rows, size, scales)
+    return out
+
+
+def rolling_robust_scales(
+    data: SeriesOrFrame,
+    windows: Sequence[int],
+    min_periods: Optional[int] = None,
+    statistics: Sequence[str] = STATISTICS,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Several rolling scale statistics in one pass.
+
+    One order-statistic structure is built per column and queried for every
+    window length together; the median, the median absolute deviation and the
+    mean absolute deviation all come from its descents.
+
+    Args:
+        data: A return series, or a panel with one column per ticker.
+        windows: Window lengths (in rows).
+        min_periods: Minimum non-NaN observations per window. Defaults to the
+            window length.
+        statistics: Any of 'mean_ad', 'median', 'median_ad'.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Per statistic, one column per window for a
+                                 Series input, or (ticker, window) MultiIndex
+                                 columns for a panel.
+    """
+    windows = list(windows)
+    if any(w < 1 for w in windows):
+        raise ValueError(f"windows must be positive, got {windows}")
+    unknown = set(statistics) - set(STATISTICS)
+    if unknown:
+        raise ValueError(f"Unknown statistics {sorted(unknown)}; expected some of {list(STATISTICS)}")
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    values = frame.to_numpy(dtype=float)
+    per_column = [_rolling_scales(values[:, i], windows, min_periods, statistics) for i in range(values.shape[1])]
+
+    out = {}
+    for stat in statistics:
+        if isinstance(data, pd.Series):
+            out[stat] = pd.DataFrame(per_column[0][stat], index=data.index, columns=windows)
+        else:
+            columns = pd.MultiIndex.from_tuples([(col, w) for col in frame.columns for w in windows])
+            stacked = np.concatenate([scales[stat] for scales in per_column], axis=1)  # rows x (tickers x windows)
+            out[stat] = pd.DataFrame(stacked, index=frame.index, columns=columns)
+    return out
+
+
+def rolling_mean_abs_deviation(
+    data: SeriesOrFrame,
+    windows: Sequence[int],
+    min_periods: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Rolling mean absolute deviation around the window mean.
+
+    This is the trailing counterpart of the lifetime MAD used by the dashboard
+    and the report: mean(|x - mean(x)|) over each window.
+
+    Args:
+        data: A return series, or a panel with one column per ticker.
+        windows: Window lengths (in rows) to evaluate in a single pass.
+        min_periods: Minimum non-NaN observations per window. Defaults to the
+            window length.
+
+    Returns:
+        pd.DataFrame: One column per window for a Series input, or
+                      (ticker, window) MultiIndex columns for a panel.
+    """
+    return rolling_robust_scales(data, windows, min_periods, ["mean_ad"])["mean_ad"]
+
+
+def rolling_median(
+    data: SeriesOrFrame,
+    windows: Sequence[int],
+    min_periods: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Sliding-window median.
+
+    Args and Returns follow :func:`rolling_mean_abs_deviation`.
+    """
+    return rolling_robust_scales(data, windows, min_periods, ["median"])["median"]
+
+
+def rolling_median_abs_deviation(
+    data: SeriesOrFrame,
+    windows: Sequence[int],
+    min_periods: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Rolling median absolute deviation: median(|x - median(x)|) over each window.
+
+    The raw deviation is returned; multiply by 1.4826 for a sigma-consistent
+    scale under normality.
+
+    Args and Returns follow :func:`rolling_mean_abs_deviation`.
+    """
+    return rolling_robust_scales(data, windows, min_periods, ["median_ad"])["median_ad"]
+
+
+def ewma_mean_abs_deviation(
+    data: SeriesOrFrame,
+    halflives: Sequence[float],
+    min_periods: int = 0,
+) -> pd.DataFrame:
+    """
+    Exponentially weighted mean absolute deviation.
+
+    Each observation is scored against the EWMA mean available *before* it
+    arrives, so the estimate never looks ahead:
+
+        mu_t  = EWMA(x)_t
+        mad_t = EWMA(|x_t - mu_{t-1}|)_t
+
+    Args:
+        data: A return series, or a panel with one column per ticker.
+        halflives: Half-lives (in rows) to evaluate.
+        min_periods: Minimum observations before a value is emitted.
+
+    Returns:
+        pd.DataFrame: One column per half-life for a Series input, or
+                      (ticker, halflife) MultiIndex columns for a panel.
+    """
+    halflives = list(halflives)
+    if isinstance(data, pd.Series):
+        columns = {}
+        for halflife in halflives:
+            mean = data.ewm(halflife=halflife, min_periods=min_periods, ignore_na=True).mean()
+            deviation = (data - mean.shift(1)).abs()
+            columns[halflife] = deviation.ewm(
+                halflife=halflife, min_periods=min_periods, ignore_na=True
+            ).mean()
+        return pd.DataFrame(columns, index=data.index)
+
+    frames = {
+        col: ewma_mean_abs_deviation(data[col], halflives, min_periods)
+        for col in data.columns
+    }
+    return pd.concat(frames, axis=1)
@@ -0,0 +1,155 @@
+"""
+Out-of-core computation of the Market Monitor analytics.
+
+The in-memory path (`core.app.analytics` / `core.app.lifetime`) builds one
+DataFrame over the full history. For histories that do not fit in memory,
+the functions here consume a price series as a stream of chunks (e.g. Parquet
+row groups via `ParquetStore.iter_batches`) and carry the state that crosses
+chunk boundaries: the previous price, the high-water mark, and running sums.
+
+The lifetime statistics follow the same two-pass definition as pandas (mean
+first, then squared and absolute deviations from it), so they agree with the
+in-memory path to floating-point rounding. Log returns, drawdowns and outlier
+lists are identical element by element.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_monitor.analytics.math_lib import classify_mad_tiers
+
+ChunkSource = Callable[[], Iterable[pd.Series]]
+
+
+@dataclass
+class _CarryState:
+    """State carried across chunk boundaries."""
+    prev_price: float = np.nan
+    high_water_mark: float = np.nan
+
+
+@dataclass
+class StreamingSummary:
+    """Lifetime statistics and outliers computed from a chunked price stream."""
+    count: int
+    mean: float
+    lifetime_sigma: float
+    lifetime_mad: float
+    last: Optional[pd.Series] = None
+    outliers: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=['Log_Return', 'Tier']))
+
+    @property
+    def current_sigma_move(self) -> float:
+        return self.last['Log_Return'] / self.lifetime_sigma
+
+    @property
+    def current_mad_move(self) -> float:
+        return self.last['Log_Return'] / self.lifetime_mad
+
+
+def stream_returns(chunks: Iterable[pd.Series]) -> Iterator[pd.DataFrame]:
+    """
+    Computes log returns and drawdown chunk by chunk.
+
+    Args:
+        chunks: Consecutive, chronologically ordered price chunks.
+
+    Yields:
+        pd.DataFrame: Per chunk, columns 'Price', 'Log_Return', 'Drawdown'.
+                      Rows without a log return (the very first price) are
+                      dropped, as in the in-memory path.
+    """
+    state = _CarryState()
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        prices = chunk.to_numpy(dtype=float)
+
+        previous = np.empty_like(prices)
+        previous[0] = state.prev_price
+        previous[1:] = prices[:-1]
+        log_returns = np.log(prices / previous)
+
+        # fmax ignores NaN prices, like expanding().max()
+        high_water_mark = np.fmax.accumulate(np.concatenate([[state.high_water_mark], prices]))[1:]
+        drawdown = (prices / high_water_mark) - 1
+
+        state.prev_price = prices[-1]
+        state.high_water_mark = high_water_mark[-1]
+
+        frame = pd.DataFrame(
+            {'Price': prices, 'Log_Return': log_returns, 'Drawdown': drawdown},
+            index=chunk.index,
+        )
+        frame = frame.dropna(subset=['Log_Return'])
+        if not frame.empty:
+            yield frame
+
+
+def _log_returns(source: ChunkSource) -> Iterator[np.ndarray]:
+    for frame in stream_returns(source()):
+        yield frame['Log_Return'].to_numpy()
+
+
+def stream_lifetime_stats(
+    source: ChunkSource,
+    sink: Optional[Callable[[pd.DataFrame], None]] = None
+) -> StreamingSummary:
+    """
+    Lifetime sigma/MAD, latest move and MAD outliers with bounded memory.
+
+    The stream is read three times: (1) returns, drawdowns and the mean,
+    (2) squared and absolute deviations from the mean, (3) outlier
+    classification against the lifetime MAD. Only one chunk is held at a time.
+
+    Args:
+        source: Zero-argument callable returning a fresh iterable of price
+            chunks, e.g. ``lambda: (b['^GSPC'] for b in store.iter_batches('^GSPC'))``.
+        sink: Optional callback receiving each processed chunk of the first
+            pass ('Price', 'Log_Return', 'Drawdown'), e.g. to persist it.
+
+    Returns:
+        StreamingSummary: The lifetime statistics, last row and outliers.
+    """
+    # Pass 1: returns, drawdowns, mean
+    partial_sums: List[float] = []
+    count = 0
+    last = None
+    for frame in stream_returns(source()):
+        values = frame['Log_Return'].to_numpy()
+        values = values[~np.isnan(values)]
+        partial_sums.append(float(values.sum()))
+        count += len(values)
+        last = frame.iloc[-1]
+        if sink is not None:
+            sink(frame)
+
+    if count == 0:
+        return StreamingSummary(0, np.nan, np.nan, np.nan)
+    mean = math.fsum(partial_sums) / count
+
+    # Pass 2: deviations from the mean
+    squared: List[float] = []
+    absolute: List[float] = []
+    for values in _log_returns(source):
+        deviations = values[~np.isnan(values)] - mean
+        squared.append(float((deviations ** 2).sum()))
+        absolute.append(float(np.abs(deviations).sum()))
+    lifetime_sigma = math.sqrt(math.fsum(squared) / (count - 1)) if count > 1 else np.nan
+    lifetime_mad = math.fsum(absolute) / count
+
+    # Pass 3: outliers against the lifetime MAD
+    outliers = []
+    for frame in stream_returns(source()):
+        tier = classify_mad_tiers(frame['Log_Return'], lifetime_mad)
+        mask = tier != 0
+        if mask.any():
+            outliers.append(pd.DataFrame({'Log_Return': frame['Log_Return'][mask], 'Tier': tier[mask]}))
+
+    summary = StreamingSummary(count, mean, lifetime_sigma, lifetime_mad, last)
+    if outliers:
+        summary.outliers = pd.concat(outliers)
+    return summary
@@ -0,0 +1,9 @@
+"""
+Orchestration layer for Market Monitor.
+
+Contains the memoized pipeline engine and the application that wires the
+data, analytics and UI layers into it, plus the store-backed rolling
+correlation updates.
+"""
+
+__all__ = ["app", "correlations", "engine"]
@@ -0,0 +1,331 @@
+"""
+The Market Monitor application, expressed as an engine pipeline:
+
+    ingest -> align -> analytics -> lifetime -> records -> report
+                                 \\-----------> render
+
+`ingest` always runs (it reads the store and performs the delta sync); every
+stage after it is memoized by the hash of its inputs, so an unchanged store
+short-circuits to the cached report. At a weekly, monthly or yearly frequency
+`ingest` returns the bars of the resample cache instead of the daily history.
+"""
+import logging
+import os
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from market_monitor.analytics.math_lib import get_log_returns, calculate_drawdown
+from market_monitor.core.engine import Engine, Stage
+from market_monitor.data.adapters import YahooFinanceAdapter, FredAdapter
+from market_monitor.data.calendars import US_FEDERAL, XNYS
+from market_monitor.data.freshness import FreshnessPlanner, FRED_DAILY, FRED_MONTHLY, YAHOO_US_DAILY
+from market_monitor.data.manager import fetch_and_update
+from market_monitor.data.resample import FREQUENCIES, ResampleCache
+from market_monitor.data.store import ParquetStore
+from market_monitor.data.transport import Transport
+from market_monitor.data.validation import DeltaValidator, QualityRules
+from market_monitor.ui.reporter import Reporter, ReportRecord, format_record
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+TICKER_SPX = "^GSPC"
+TICKER_VIX = "^VIX"
+TICKER_SLOPE = "T10Y3M" # FRED Series ID
+TICKER_RECESSION = "USREC" # FRED Recession Indicator
+DEFAULT_START_DATE = "1927-12-30"
+DAILY = "daily"
+
+# Price series reported on, one record each: ticker -> column of the aligned frame
+REPORT_COLUMNS = {
+    TICKER_SPX: 'SPX',
+    TICKER_VIX: 'VIX',
+}
+
+# Publication schedule of each ticker, used to skip fetches that cannot return new data
+SOURCE_SCHEDULES = {
+    TICKER_SPX: YAHOO_US_DAILY,
+    TICKER_VIX: YAHOO_US_DAILY,
+    TICKER_SLOPE: FRED_DAILY,
+    TICKER_RECESSION: FRED_MONTHLY,
+}
+
+# Data-quality checks applied to each delta before it is stored
+QUALITY_RULES = {
+    TICKER_SPX: QualityRules(calendar=XNYS),
+    TICKER_VIX: QualityRules(calendar=XNYS),
+    TICKER_SLOPE: QualityRules(positive=False, calendar=US_FEDERAL, jump_mads=None), # Rates can be <= 0
+    TICKER_RECESSION: QualityRules(positive=False, jump_mads=None), # 0/1 indicator
+}
+
+
+class NoDataError(RuntimeError):
+    """Raised when the primary (SPX) series is unavailable."""
+
+
+def ingest(store: ParquetStore, offline: bool, frequency: str = DAILY) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Loads each ticker from the store, delta-syncing it first unless offline.
+
+    Below daily frequency, the resample cache is brought up to date and its
+    bars (with 'Close', 'Log_Return', 'Drawdown' columns) are returned.
+    """
+    if offline:
+        logger.info("[*] Mode: OFFLINE")
+        raw = {
+            'spx': store.load(TICKER_SPX),
+            'vix': store.load(TICKER_VIX),
+            'slope': store.load(TICKER_SLOPE),
+            'recession': store.load(TICKER_RECESSION),
+        }
+    else:
+        logger.info("[*] Mode: ONLINE (Delta Sync)")
+        # One pooled transport per sync; validators persist next to the store
+        transport = Transport(cache_dir=os.path.join(store.cache_dir, '.http'))
+        adapter_yahoo = YahooFinanceAdapter(use_cache=False, transport=transport)
+        adapter_fred = FredAdapter(use_cache=False, transport=transport)
+        planner = FreshnessPlanner(SOURCE_SCHEDULES)
+        validator = DeltaValidator(store, QUALITY_RULES)
+        try:
+            raw = {
+                'spx': fetch_and_update(TICKER_SPX, adapter_yahoo, store, DEFAULT_START_DATE, planner, validator),
+                'vix': fetch_and_update(TICKER_VIX, adapter_yahoo, store, "1990-01-01", planner, validator), # VIX usually starts 1990
+                'slope': fetch_and_update(TICKER_SLOPE, adapter_fred, store, DEFAULT_START_DATE, planner, validator),
+                'recession': fetch_and_update(TICKER_RECESSION, adapter_fred, store, "1850-01-01", planner, validator), # Fetch full history
+            }
+        finally:
+            transport.close()
+
+    if raw['spx'] is None or raw['spx'].empty:
+        raise NoDataError("No SPX data available.")
+
+    if frequency != DAILY:
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency {frequency}")
+        cache = ResampleCache(store)
+        tickers = {'spx': TICKER_SPX, 'vix': TICKER_VIX, 'slope': TICKER_SLOPE, 'recession': TICKER_RECESSION}
+        for name, df in raw.items():
+            if df is not None and not df.empty:
+                cache.update(tickers[name], extract_series(df, tickers[name]))
+                raw[name] = cache.load(tickers[name], frequency)
+    return raw
+
+
+def extract_series(df_in: Optional[pd.DataFrame], col_name_candidate: str) -> pd.Series:
+    """Pulls a single price series out of a cached or fetched frame."""
+    if df_in is None or df_in.empty: return pd.Series(dtype=float)
+    # If MultiIndex columns (Ticker, Attribute)
+    if isinstance(df_in.columns, pd.MultiIndex):
+        # Try to find 'Close' for the ticker
+        try:
+            return df_in['Close'][col_name_candidate]
+        except KeyError:
+            # Maybe just one level?
+            pass
+
+    # If simple index
+    if col_name_candidate in df_in.columns:
+        return df_in[col_name_candidate]
+    elif 'Close' in df_in.columns:
+        return df_in['Close']
+    elif 'SPX' in df_in.columns: # Legacy CSV
+        return df_in['SPX']
+    elif 'VIX' in df_in.columns:
+        return df_in['VIX']
+    elif 'T10Y3M' in df_in.columns:
+        return df_in['T10Y3M']
+    elif 'USREC' in df_in.columns:
+        return df_in['USREC']
+    else:
+        return df_in.iloc[:, 0]
+
+
+def align(ingest: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Builds the master frame aligned to SPX trading days."""
+    df_spx = ingest['spx']
+    df = pd.DataFrame(index=df_spx.index)
+    df['SPX'] = extract_series(df_spx, TICKER_SPX)
+
+    # Join VIX and Slope (forward fill for days when macro data is missing but market is open)
+    s_vix = extract_series(ingest['vix'], TICKER_VIX)
+    s_slope = extract_series(ingest['slope'], TICKER_SLOPE)
+    s_rec = extract_series(ingest['recession'], TICKER_RECESSION)
+
+    # Reindex to match SPX
+    df['VIX'] = s_vix.reindex(df.index, method='ffill')
+    df['Slope'] = s_slope.reindex(df.index, method='ffill')
+    df['Recession'] = s_rec.reindex(df.index, method='ffill')
+
+    # Resampled bars carry their materialized returns and drawdown
+    for column in ('Log_Return', 'Drawdown'):
+        if column in df_spx.columns:
+            df[column] = df_spx[column]
+    return df
+
+
+def analytics(align: pd.DataFrame) -> pd.DataFrame:
+    """Adds log returns and drawdown (unless already materialized)."""
+    df = align.copy()
+    if 'Log_Return' not in df.columns:
+        df['Log_Return'] = get_log_returns(df['SPX'])
+    if 'Drawdown' not in df.columns:
+        df['Drawdown'] = calculate_drawdown(df['SPX'])
+
+    # Drop first NaN from log return
+    return df.dropna(subset=['Log_Return'])
+
+
+def _lifetime_stats(log_returns: pd.Series) -> Dict[str, float]:
+    lifetime_sigma = log_returns.std()
+    lifetime_mad = (log_returns - log_returns.mean()).abs().mean()
+
+    current_log_ret = log_returns.iloc[-1]
+    return {
+        'lifetime_sigma': lifetime_sigma,
+        'lifetime_mad': lifetime_mad,
+        'current_sigma_move': current_log_ret / lifetime_sigma,
+        'current_mad_move': current_log_ret / lifetime_mad,
+    }
+
+
+def lifetime(analytics: pd.DataFrame) -> Dict[str, float]:
+    """Lifetime sigma/MAD and the latest move expressed in both."""
+    return _lifetime_stats(analytics['Log_Return'])
+
+
+def records(analytics: pd.DataFrame, lifetime: Dict[str, float], frequency: str = DAILY) -> Iterator[ReportRecord]:
+    """
+    The structured report of the latest bar, one record per ticker in `REPORT_COLUMNS`.
+
+    SPX uses the analytics frame and its lifetime stats; every other ticker
+    gets its own returns, drawdown and lifetime stats from its column. Records
+    are yielded as each ticker is finished.
+    """
+    yield ReportRecord.from_frame(
+        analytics,
+        lifetime['lifetime_sigma'],
+        lifetime['lifetime_mad'],
+        ticker=TICKER_SPX,
+        frequency=frequency,
+    )
+    for ticker, column in REPORT_COLUMNS.items():
+        if ticker == TICKER_SPX or column not in analytics.columns:
+            continue
+        prices = analytics[column].dropna()
+        frame = analytics.loc[prices.index].copy()
+        frame['Log_Return'] = get_log_returns(prices)
+        frame['Drawdown'] = calculate_drawdown(prices)
+        frame = frame.dropna(subset=['Log_Return'])
+        if frame.empty:
+            continue
+        stats = _lifetime_stats(frame['Log_Return'])
+        yield ReportRecord.from_frame(
+            frame,
+            stats['lifetime_sigma'],
+            stats['lifetime_mad'],
+            ticker=ticker,
+            frequency=frequency,
+            price_column=column,
+        )
+
+
+def report(records: List[ReportRecord]) -> str:
+    """Formats the operational briefing of each ticker."""
+    return "\n".join(format_record(record) for record in records)
+
+
+def render(
+    analytics: pd.DataFrame,
+    lifetime: Dict[str, float],
+    serve_port: Optional[int] = None,
+    tiles_dir: Optional[str] = None
+) -> None:
+    """
+    Plots the dashboard, or serves its tracks over HTTP.
+
+    When serving, the tile pyramid persisted in `tiles_dir` is brought up to
+    date with the rows added since the last run instead of being rebuilt.
+    """
+    if serve_port is not None:
+        from market_monitor.ui.tile_server import TilePyramid, TileServer
+        pyramid = TilePyramid.load(tiles_dir) if tiles_dir else TilePyramid()
+        pyramid.update(analytics, lifetime['lifetime_mad'])
+        if tiles_dir:
+            pyramid.save(tiles_dir)
+        TileServer(pyramid, port=serve_port).serve_forever()
+        return
+
+    from market_monitor.ui.dashboard import MatplotlibDashboard
+    context = {
+        'lifetime_sigma': lifetime['lifetime_sigma'],
+        'lifetime_mad': lifetime['lifetime_mad']
+    }
+    MatplotlibDashboard().render(analytics, context)
+
+
+class MarketMonitorApp:
+    """
+    Wires the Market Monitor pipeline into an `Engine`.
+
+    Args:
+        store: The ParquetStore holding the ticker histories.
+        offline: Use local data only, do not fetch new data.
+        serve_port: Serve dashboard tiles on this port instead of plotting.
+        use_cache: Set False to recompute every stage.
+        frequency: 'daily', or a resample cache frequency ('weekly',
+            'monthly', 'yearly') to analyse bars instead of days.
+    """
+    def __init__(
+        self,
+        store: ParquetStore,
+        offline: bool = False,
+        serve_port: Optional[int] = None,
+        use_cache: bool = True,
+        frequency: str = DAILY
+    ):
+        self.store = store
+        self.engine = Engine(
+            [
+                Stage('ingest', ingest, params={'store': store, 'offline': offline, 'frequency': frequency},
+                      cache=False),
+                Stage('align', align, deps=['ingest']),
+                Stage('analytics', analytics, deps=['align']),
+                Stage('lifetime', lifetime, deps=['analytics']),
+                Stage('records', records, deps=['analytics', 'lifetime'], params={'frequency': frequency},
+                      stream=True),
+                Stage('report', report, deps=['records']),
+                Stage('render', render, deps=['analytics', 'lifetime'],
+                      params={'serve_port': serve_port, 'tiles_dir': os.path.join(store.cache_dir, '.tiles', frequency)},
+                      cache=False),
+            ],
+            cache_dir=os.path.join(store.cache_dir, '.pipeline'),
+            use_cache=use_cache,
+        )
+
+    def run(self, show: bool = True, reporter: Optional[Reporter] = None) -> Optional[str]:
+        """
+        Runs the pipeline and prints the report.
+
+        Args:
+            show: Render the dashboard after printing the report.
+            reporter: Emit one report record per ticker here instead of
+                printing the text (the text stage is then not run). Each
+                record is emitted as soon as its ticker is finished.
+
+        Returns:
+            Optional[str]: The report text, or None when a reporter is given.
+        """
+        text = None
+        if reporter is None:
+            text = self.engine.run('report')
+            print(text)
+        else:
+            for record in self.engine.stream('records'):
+                reporter.emit(record)
+        if show:
+            self.engine.run('render')
+        return text
+
+    def explain(self) -> str:
+        return self.engine.explain()
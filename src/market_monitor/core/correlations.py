@@ -0,0 +1,77 @@
+"""
+Persisted rolling correlations.
+
+Wires `analytics.correlation` to the store: each block pair of a rolling
+covariance/correlation run is kept under its own key and extended as the
+panel grows. An extension computes only the new rows (seeded by the
+preceding `window - 1` rows) and appends them as a new part of the block,
+so neither the compute nor the I/O grows with the stored history.
+"""
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from market_monitor.analytics.correlation import block_key, iter_column_blocks, rolling_pairwise_moments
+from market_monitor.data.store import ParquetStore
+
+logger = logging.getLogger(__name__)
+
+
+def update_rolling_correlations(
+    panel: pd.DataFrame,
+    window: int,
+    store: ParquetStore,
+    block_size: int = 32,
+    min_periods: Optional[int] = None,
+) -> List[str]:
+    """
+    Extends the stored rolling covariance/correlation results for `panel`.
+
+    Each block pair is stored under its own key. Only rows after the last
+    stored date are computed and appended; a block whose stored pairs no
+    longer match the panel is rebuilt.
+
+    Args:
+        panel: Aligned panel (e.g. log returns), one column per series.
+        window: Window length in rows.
+        store: The ParquetStore instance.
+        block_size: Columns per block.
+        min_periods: Minimum pairwise-complete observations.
+
+    Returns:
+        List[str]: The keys of the blocks that were written.
+    """
+    updated = []
+    for (bi, bj), left, right in iter_column_blocks(panel, block_size):
+        key = block_key(window, bi, bj)
+        last_date = store.get_last_date(key)
+
+        start = 0
+        if last_date is not None:
+            start = int(panel.index.searchsorted(last_date, side='right'))
+            if start >= len(panel):
+                logger.debug(f"{key} is up to date.")
+                continue
+
+        df_new = rolling_pairwise_moments(
+            left, right, window,
+            min_periods=min_periods,
+            start=start,
+            symmetric=(bi == bj),
+        )
+
+        if start > 0 and store.get_columns(key).equals(df_new.columns):
+            store.append(df_new, key)
+        else:
+            if start > 0:
+                logger.info(f"{key} universe changed. Rebuilding block...")
+                df_new = rolling_pairwise_moments(
+                    left, right, window,
+                    min_periods=min_periods,
+                    symmetric=(bi == bj),
+                )
+            store.save(df_new, key)
+        updated.append(key)
+
+    return updated
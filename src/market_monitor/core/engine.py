@@ -0,0 +1,316 @@
+"""
+Memoized pipeline engine.
+
+A pipeline is a DAG of named stages. Each cached stage's output is stored on
+disk under a key derived from its name, version, parameters and the content
+hashes of its inputs; a few outputs (variants) are kept per stage. Keys are
+resolved lazily: a stage whose key matches a stored variant is a hit and only
+its output hash is consulted, so a rerun with unchanged inputs goes straight
+to the cached result without loading (or recomputing) anything upstream of it.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+HIT = "hit"
+MISS = "miss"
+ALWAYS = "run"
+
+
+def content_hash(obj: Any) -> str:
+    """
+    Stable content hash of a stage output or parameter.
+
+    DataFrames and Series are hashed by index, columns and values; containers
+    are hashed recursively; anything else by its repr.
+    """
+    h = hashlib.sha256()
+
+    def feed(value: Any):
+        if isinstance(value, pd.DataFrame):
+            h.update(b"DataFrame")
+            h.update(repr(list(value.columns)).encode())
+            h.update(repr(list(value.dtypes.astype(str))).encode())
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        elif isinstance(value, pd.Series):
+            h.update(b"Series")
+            h.update(repr((value.name, str(value.dtype))).encode())
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        elif isinstance(value, np.ndarray):
+            h.update(b"ndarray")
+            h.update(repr((value.dtype.str, value.shape)).encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            h.update(b"dict")
+            for key in sorted(value, key=repr):
+                h.update(repr(key).encode())
+                feed(value[key])
+        elif isinstance(value, (list, tuple)):
+            h.update(type(value).__name__.encode())
+            for item in value:
+                feed(item)
+        elif value is None:
+            h.update(b"None")
+        else:
+            h.update(repr(value).encode())
+
+    feed(obj)
+    return h.hexdigest()
+
+
+@dataclass
+class Stage:
+    """
+    A pipeline step.
+
+    Attributes:
+        name: Unique stage name; also the keyword under which downstream
+            stages receive this stage's output.
+        func: Callable invoked as `func(**{dep: output}, **params)`.
+        deps: Names of the stages whose outputs `func` consumes.
+        params: Keyword parameters, part of the cache key.
+        cache: Whether the output is memoized on disk. Stages with side
+            effects or external inputs (ingestion, rendering) always run.
+        version: Bump to invalidate cached outputs after changing `func`.
+        stream: `func` returns an iterable (e.g. a generator). Its items can
+            be consumed one at a time with `Engine.stream`; the stage output
+            is the list of all items.
+    """
+    name: str
+    func: Callable[..., Any]
+    deps: Sequence[str] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    cache: bool = True
+    version: str = "1"
+    stream: bool = False
+
+
+@dataclass
+class StageRecord:
+    """How a stage was resolved during a run."""
+    name: str
+    status: str
+    key: Optional[str] = None
+    loaded: bool = False
+
+
+class Engine:
+    """
+    Runs a DAG of stages with content-hashed, on-disk memoization.
+
+    Each stage keeps the outputs of its `max_variants` most recently used
+    keys, so runs that alternate parameters (e.g. the bar frequency) hit the
+    cache for each of them. The manifest maps each stage to its variants,
+    most recent first: the key each was computed under and the hash of its
+    output, which is all that is needed to resolve downstream keys.
+
+    Args:
+        stages: The pipeline stages, in any order.
+        cache_dir: Directory for the manifest and pickled stage outputs.
+        use_cache: Set False to recompute (and re-store) every stage.
+        max_variants: Outputs kept per stage.
+    """
+    MANIFEST = "manifest.json"
+
+    def __init__(self, stages: Sequence[Stage], cache_dir: str, use_cache: bool = True, max_variants: int = 4):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            missing = [d for d in stage.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {missing}")
+        self._check_acyclic()
+
+        if max_variants < 1:
+            raise ValueError("max_variants must be at least 1")
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.max_variants = max_variants
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        self.manifest = self._load_manifest()
+
+        self.trace: Dict[str, StageRecord] = {}
+        self._values: Dict[str, Any] = {}
+        self._hashes: Dict[str, str] = {}
+        self._keys: Dict[str, str] = {}
+
+    def _check_acyclic(self):
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 1:
+                raise ValueError(f"Pipeline cycle: {' -> '.join(path + [name])}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in self.stages:
+            visit(name, [])
+
+    # -- Manifest ------------------------------------------------------------
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, self.MANIFEST)
+
+    def _output_path(self, name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}-{key[:16]}.pkl")
+
+    def _load_manifest(self) -> Dict[str, List[Dict[str, str]]]:
+        try:
+            with open(self._manifest_path()) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        # Entries of the single-output layout are dropped (recomputed once)
+        return {name: variants for name, variants in manifest.items() if isinstance(variants, list)}
+
+    def _save_manifest(self):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self._manifest_path())
+
+    # -- Resolution ----------------------------------------------------------
+
+    def _key(self, name: str) -> str:
+        if name not in self._keys:
+            stage = self.stages[name]
+            self._keys[name] = content_hash({
+                "stage": name,
+                "version": stage.version,
+                "func": f"{getattr(stage.func, '__module__', '')}.{getattr(stage.func, '__qualname__', type(stage.func).__name__)}",
+                "params": stage.params,
+                "inputs": {dep: self._output_hash(dep) for dep in stage.deps},
+            })
+        return self._keys[name]
+
+    def _variant(self, name: str) -> Optional[Dict[str, str]]:
+        """The manifest entry of `name` under its current key, if its output is stored."""
+        stage = self.stages[name]
+        if not (self.use_cache and stage.cache):
+            return None
+        key = self._key(name)
+        for variant in self.manifest.get(name, []):
+            if variant["key"] == key and os.path.exists(self._output_path(name, key)):
+                return variant
+        return None
+
+    def _is_hit(self, name: str) -> bool:
+        return self._variant(name) is not None
+
+    def _hit(self, name: str) -> StageRecord:
+        """Records a hit and marks its variant as the most recently used."""
+        variant = self._variant(name)
+        self._hashes[name] = variant["hash"]
+        variants = self.manifest[name]
+        if variants[0] is not variant:
+            variants.remove(variant)
+            variants.insert(0, variant)
+            self._save_manifest()
+        return self.trace.setdefault(name, StageRecord(name, HIT, self._key(name)))
+
+    def _output_hash(self, name: str) -> str:
+        if name not in self._hashes:
+            if self._is_hit(name):
+                self._hit(name)
+            else:
+                self._value(name)
+        return self._hashes[name]
+
+    def _value(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+
+        stage = self.stages[name]
+        if self._is_hit(name):
+            with open(self._output_path(name, self._key(name)), "rb") as f:
+                value = pickle.load(f)
+            record = self._hit(name)
+            record.loaded = True
+            logger.debug(f"[engine] {name}: cache hit")
+            self._values[name] = value
+        else:
+            value = self._call(name)
+            if stage.stream:
+                value = list(value)
+            self._store(name, value)
+        return self._values[name]
+
+    def _call(self, name: str) -> Any:
+        stage = self.stages[name]
+        inputs = {dep: self._value(dep) for dep in stage.deps}
+        logger.debug(f"[engine] {name}: running")
+        return stage.func(**inputs, **stage.params)
+
+    def _store(self, name: str, value: Any):
+        stage = self.stages[name]
+        self._hashes[name] = content_hash(value)
+        if stage.cache:
+            key = self._key(name)
+            with open(self._output_path(name, key), "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            variants = [v for v in self.manifest.get(name, []) if v["key"] != key]
+            variants.insert(0, {"key": key, "hash": self._hashes[name]})
+            for evicted in variants[self.max_variants:]:
+                if os.path.exists(self._output_path(name, evicted["key"])):
+                    os.remove(self._output_path(name, evicted["key"]))
+            self.manifest[name] = variants[:self.max_variants]
+            self._save_manifest()
+            self.trace[name] = StageRecord(name, MISS, key, loaded=True)
+        else:
+            self.trace[name] = StageRecord(name, ALWAYS, loaded=True)
+        self._values[name] = value
+
+    def run(self, target: str) -> Any:
+        """Returns the output of `target`, computing only what is stale."""
+        if target not in self.stages:
+            raise KeyError(f"Unknown stage {target}")
+        return self._value(target)
+
+    def stream(self, target: str) -> Iterator[Any]:
+        """
+        Yields the items of a `stream` stage as they are produced.
+
+        On a miss each item is yielded as soon as the stage function produces
+        it, and the list of items is stored once the iterable is exhausted (an
+        abandoned stream stores nothing). A hit yields the cached items.
+        """
+        if target not in self.stages:
+            raise KeyError(f"Unknown stage {target}")
+        if not self.stages[target].stream:
+            raise ValueError(f"Stage {target} is not a stream stage")
+        if target in self._values or self._is_hit(target):
+            yield from self._value(target)
+            return
+
+        items = []
+        for item in self._call(target):
+            items.append(item)
+            yield item
+        self._store(target, items)
+
+    def explain(self) -> str:
+        """Summarises how each stage was resolved so far (hit / miss / run / skipped)."""
+        lines = [f"{'STAGE':<12} {'STATUS':<8} {'LOADED':<7} KEY"]
+        for name in self.stages:
+            record = self.trace.get(name)
+            if record is None:
+                lines.append(f"{name:<12} {'skipped':<8} {'-':<7} -")
+                continue
+            key = record.key[:12] if record.key else "-"
+            lines.append(f"{name:<12} {record.status:<8} {'yes' if record.loaded else 'no':<7} {key}")
+        return "\n".join(lines)
@@ -1,7 +1,10 @@
 """
 Data layer for Extremistan.
 
-Contains adapters for external data sources and local caching utilities.
+Contains adapters for external data sources, the shared HTTP transport they
+fetch through, local caching utilities (including the multi-frequency
+resample cache), delta validation, and the trading calendars used to plan
+delta fetches.
 """
 
-__all__ = ["adapters", "interfaces", "store"]
+__all__ = ["adapters", "calendars", "freshness", "interfaces", "manager", "resample", "store", "transport", "validation"]
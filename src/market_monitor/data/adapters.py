@@ -1,18 +1,30 @@
+import logging
 import pandas as pd
 import yfinance as yf
+from yfinance.exceptions import YFPricesMissingError, YFRateLimitError
+from curl_cffi.requests.exceptions import ConnectionError as CurlConnectionError, Timeout as CurlTimeout
 import pandas_datareader.data as web
 import numpy as np
 from typing import List, Optional
 from market_monitor.data.interfaces import DataSource
 from market_monitor.data.store import ParquetStore
+from market_monitor.data.transport import Transport, default_transport
+
+logger = logging.getLogger(__name__)
+
+YAHOO_HOST = "query2.finance.yahoo.com"
+# yfinance errors worth retrying (curl_cffi's, not requests', on its session)
+YAHOO_TRANSIENT_ERRORS = (CurlConnectionError, CurlTimeout, YFRateLimitError)
 
 class FredAdapter(DataSource):
     """
     Fetches economic data from FRED (Federal Reserve Economic Data).
-    Includes caching via ParquetStore.
+    Includes caching via ParquetStore. Requests go through the shared
+    Transport (pooled session, rate limit, backoff, conditional requests).
     """
-    def __init__(self, use_cache: bool = True):
+    def __init__(self, use_cache: bool = True, transport: Optional[Transport] = None):
         self.store = ParquetStore() if use_cache else None
+        self.transport = transport or default_transport()
 
     def get_data(self, tickers: List[str], start_date: str, end_date: Optional[str] = None) -> pd.DataFrame:
         # 1. Try Cache
@@ -24,7 +36,9 @@ class FredAdapter(DataSource):
         # 2. Fetch Live
         try:
             # pandas_datareader syntax for FRED: web.DataReader(tickers, 'fred', start, end)
-            data = web.DataReader(tickers, 'fred', start_date, end_date)
+            # Retries are handled by the transport, not the reader
+            data = web.DataReader(tickers, 'fred', start_date, end_date,
+                                  retry_count=0, session=self.transport.session)
 
             if data.empty:
                 return pd.DataFrame()
@@ -39,16 +53,26 @@ class FredAdapter(DataSource):
             return data
 
         except Exception as e:
-            print(f"Error processing FRED data: {e}")
+            logger.error(f"Error processing FRED data for {tickers}: {e}")
             return pd.DataFrame()
 
 class YahooFinanceAdapter(DataSource):
     """
     Fetches data from Yahoo Finance API.
-    Includes caching via ParquetStore.
+    Includes caching via ParquetStore. Requests share the Transport's curl_cffi
+    session, rate limit and backoff; rate limiting is retried, a range without
+    prices is not. Connection errors and timeouts are retried only if
+    yfinance raises them, i.e. with `yf.config.debug.hide_exceptions = False`
+    (set by `main`); otherwise yfinance logs them and returns an empty frame,
+    which is treated like a range without prices.
     """
-    def __init__(self, use_cache: bool = True):
+    def __init__(self, use_cache: bool = True, transport: Optional[Transport] = None):
         self.store = ParquetStore() if use_cache else None
+        self.transport = transport or default_transport()
+
+    @staticmethod
+    def _history(ticker: str, start_date: str, end_date: Optional[str], session) -> pd.DataFrame:
+        return yf.Ticker(ticker, session=session).history(start=start_date, end=end_date, auto_adjust=True)
 
     def get_data(self, tickers: List[str], start_date: str, end_date: Optional[str] = None) -> pd.DataFrame:
         # 1. Try Cache
@@ -57,46 +81,32 @@ class YahooFinanceAdapter(DataSource):
             if cached_data is not None:
                 return cached_data
 
-        # 2. Fetch Live
-        # yfinance download
-        data = yf.download(tickers, start=start_date, end=end_date, auto_adjust=True, progress=False)
+        # 2. Fetch Live, one request per ticker on the shared session
+        session = self.transport.browser_session()
+        closes = {}
+        for ticker in tickers:
+            try:
+                history = self.transport.call(YAHOO_HOST, self._history, ticker, start_date, end_date, session,
+                                              retry_on=YAHOO_TRANSIENT_ERRORS)
+            except YFPricesMissingError as e:
+                logger.warning(f"No Yahoo data for {ticker}: {e}")
+                continue
+            except Exception as e:
+                logger.error(f"Error downloading Yahoo data for {tickers}: {e}")
+                return pd.DataFrame()
+            if not history.empty and 'Close' in history.columns:
+                closes[ticker] = history['Close']
 
-        if data.empty:
+        if not closes:
             return pd.DataFrame()
 
-        # 3. Standardize Structure
-        # We expect specific columns SPX and VIX usually.
-        # But this adapter should be generic enough to return the raw data frame
-        # or a standardized one.
-        # For this specific project, the consuming code expects columns 'SPX' and 'VIX'.
-        # However, the Adapter should probably return the multi-index or flattened frame
-        # and let the caller map it, OR map it here if we know the mapping.
-
-        # Let's standardize here to match the target architecture requirements:
-        # "Pandas as Common Tongue: All modules exchange data via Pandas DataFrames/Series."
-
-        # For simplicity in this project context, we will try to extract 'Close' prices.
+        # 3. Standardize Structure: one Close column per ticker, tz-naive dates
         try:
-             # Handle MultiIndex vs Single Index
-            if isinstance(data.columns, pd.MultiIndex):
-                # data['Close'] contains columns for each ticker
-                df_close = data['Close'].copy()
-            else:
-                # Single ticker, data columns are 'Open', 'High', 'Low', 'Close', ...
-                # We rename 'Close' to the ticker name for consistency if we can
-                # But yf.download usually returns multiindex if list passed, even of length 1?
-                # Actually yf.download(..., group_by='column') is default.
-                if 'Close' in data.columns:
-                     df_close = pd.DataFrame(data['Close'])
-                     # If only one ticker requested, we might not know its name here easily
-                     # without looking at input `tickers`.
-                     if len(tickers) == 1:
-                         df_close.columns = tickers
-                else:
-                    df_close = data # Fallback
-
-            # Ensure index is DatetimeIndex
+            df_close = pd.DataFrame(closes)
             df_close.index = pd.to_datetime(df_close.index)
+            if df_close.index.tz is not None:
+                df_close.index = df_close.index.tz_localize(None)
+            df_close.index.name = 'Date'
 
             # 4. Save to Cache
             if self.store:
@@ -105,7 +115,7 @@ class YahooFinanceAdapter(DataSource):
             return df_close
 
         except Exception as e:
-            print(f"Error processing Yahoo data: {e}")
+            logger.error(f"Error processing Yahoo data: {e}")
             return pd.DataFrame()
 
 class CSVAdapter(DataSource):
@@ -136,5 +146,5 @@ class CSVAdapter(DataSource):
                 # For this specific task, we know the CSV structure likely matches what we need or we return all.
                 return df
         except FileNotFoundError:
-            print(f"File not found: {self.filepath}")
+            logger.error(f"File not found: {self.filepath}")
             return pd.DataFrame()
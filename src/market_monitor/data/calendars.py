@@ -0,0 +1,160 @@
+"""
+Offline trading and publication calendars.
+
+Holidays are generated from the published rules of each calendar plus a table
+of one-off closures, so no network lookup is needed to know whether a session
+took place. The rules reflect the modern schedules (MLK Day from 1998,
+Juneteenth from 2021/2022); pre-1990 history, with its Saturday sessions and
+irregular closures, is not modelled.
+"""
+import csv
+from datetime import date, timedelta
+from typing import Iterable, Optional, Set
+
+import pandas as pd
+
+FIRST_YEAR = 1970
+LAST_YEAR = 2100
+
+# Unscheduled NYSE closures (weather, national days of mourning, 9/11)
+XNYS_SPECIAL_CLOSURES = (
+    date(1985, 9, 27),   # Hurricane Gloria
+    date(1994, 4, 27),   # Richard Nixon
+    date(2001, 9, 11),
+    date(2001, 9, 12),
+    date(2001, 9, 13),
+    date(2001, 9, 14),
+    date(2004, 6, 11),   # Ronald Reagan
+    date(2007, 1, 2),    # Gerald Ford
+    date(2012, 10, 29),  # Hurricane Sandy
+    date(2012, 10, 30),
+    date(2018, 12, 5),   # George H. W. Bush
+    date(2025, 1, 9),    # Jimmy Carter
+)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based) `weekday` (Mon=0) of the month; n=-1 for the last."""
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date, saturday_to_friday: bool = True) -> Optional[date]:
+    """Moves a fixed-date holiday off the weekend."""
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    if day.weekday() == 5:
+        return day - timedelta(days=1) if saturday_to_friday else None
+    return day
+
+
+def nyse_holidays(first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> Set[date]:
+    """Full-day NYSE holidays between `first_year` and `last_year` inclusive."""
+    holidays = set()
+    for year in range(first_year, last_year + 1):
+        # New Year's Day falling on Saturday is not observed on the prior Friday
+        holidays.add(_observed(date(year, 1, 1), saturday_to_friday=False))
+        if year >= 1998:
+            holidays.add(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+        holidays.add(_nth_weekday(year, 2, 0, 3))      # Washington's Birthday
+        holidays.add(_easter(year) - timedelta(days=2))  # Good Friday
+        holidays.add(_nth_weekday(year, 5, 0, -1))     # Memorial Day
+        if year >= 2022:
+            holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+        holidays.add(_observed(date(year, 7, 4)))      # Independence Day
+        holidays.add(_nth_weekday(year, 9, 0, 1))      # Labor Day
+        holidays.add(_nth_weekday(year, 11, 3, 4))     # Thanksgiving
+        holidays.add(_observed(date(year, 12, 25)))    # Christmas
+    holidays.update(d for d in XNYS_SPECIAL_CLOSURES if first_year <= d.year <= last_year)
+    holidays.discard(None)
+    return holidays
+
+
+def us_federal_holidays(first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> Set[date]:
+    """
+    Federal Reserve holidays, which govern the FRED daily rate series (H.15).
+    Holidays falling on Saturday are not observed; Sunday moves to Monday.
+    """
+    holidays = set()
+    for year in range(first_year, last_year + 1):
+        fixed = [date(year, 1, 1), date(year, 7, 4), date(year, 11, 11), date(year, 12, 25)]
+        if year >= 2021:
+            fixed.append(date(year, 6, 19))
+        for day in fixed:
+            holidays.add(_observed(day, saturday_to_friday=False))
+        if year >= 1986:
+            holidays.add(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+        holidays.add(_nth_weekday(year, 2, 0, 3))      # Washington's Birthday
+        holidays.add(_nth_weekday(year, 5, 0, -1))     # Memorial Day
+        holidays.add(_nth_weekday(year, 9, 0, 1))      # Labor Day
+        holidays.add(_nth_weekday(year, 10, 0, 2))     # Columbus Day
+        holidays.add(_nth_weekday(year, 11, 3, 4))     # Thanksgiving
+    holidays.discard(None)
+    return holidays
+
+
+class TradingCalendar:
+    """
+    Weekday sessions minus a holiday table.
+
+    Args:
+        name: Calendar identifier (e.g. 'XNYS').
+        holidays: Dates on which no session takes place.
+    """
+    def __init__(self, name: str, holidays: Iterable[date]):
+        self.name = name
+        self.holidays = frozenset(pd.Timestamp(d).date() for d in holidays)
+        self._offset = pd.offsets.CustomBusinessDay(holidays=sorted(self.holidays))
+
+    @classmethod
+    def from_csv(cls, filepath: str, name: Optional[str] = None) -> "TradingCalendar":
+        """Loads a holiday table: one ISO date per row in the first column."""
+        with open(filepath, newline='') as f:
+            rows = [row[0] for row in csv.reader(f) if row and not row[0].startswith('#')]
+        holidays = []
+        for value in rows:
+            try:
+                holidays.append(pd.Timestamp(value).date())
+            except ValueError:
+                continue  # Header row
+        return cls(name or filepath, holidays)
+
+    def is_session(self, day) -> bool:
+        day = pd.Timestamp(day).date()
+        return day.weekday() < 5 and day not in self.holidays
+
+    def next_session(self, day) -> pd.Timestamp:
+        """First session strictly after `day`."""
+        return pd.Timestamp(day).normalize().tz_localize(None) + self._offset
+
+    def previous_session(self, day) -> pd.Timestamp:
+        """Last session strictly before `day`."""
+        return pd.Timestamp(day).normalize().tz_localize(None) - self._offset
+
+    def sessions(self, start, end) -> pd.DatetimeIndex:
+        """Sessions between `start` and `end` inclusive."""
+        return pd.date_range(start, end, freq=self._offset)
+
+
+XNYS = TradingCalendar('XNYS', nyse_holidays())
+US_FEDERAL = TradingCalendar('US_FEDERAL', us_federal_holidays())
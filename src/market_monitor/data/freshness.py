@@ -0,0 +1,143 @@
+"""
+Freshness planning: decide per ticker whether a fetch can return new data.
+
+A naive delta sync asks the source for anything after the last stored date
+whenever that date is in the past, which means calling Yahoo on weekends,
+holidays and before the close has published, and calling FRED every day for
+monthly series. The planner instead works out the latest observation each
+source could have published by now, from its calendar, native frequency and
+publication lag, and only plans a fetch if the store is behind it.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+from market_monitor.data.calendars import TradingCalendar, US_FEDERAL, XNYS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SourceSchedule:
+    """
+    When a source publishes new observations.
+
+    Attributes:
+        calendar: Sessions on which daily observations exist.
+        frequency: Native frequency, 'daily' or 'monthly'.
+        publish_time: Local time at which an observation becomes available.
+        lag_sessions: Daily: sessions after the observation date on which it
+            is published (0 = same day, e.g. an exchange close).
+        lag_days: Monthly: days after the period ends before it is published.
+        timezone: Time zone of `publish_time`.
+    """
+    calendar: TradingCalendar
+    frequency: str = 'daily'
+    publish_time: time = time(16, 30)
+    lag_sessions: int = 0
+    lag_days: int = 0
+    timezone: str = 'America/New_York'
+
+
+# Yahoo daily bars settle shortly after the 16:00 NYSE close
+YAHOO_US_DAILY = SourceSchedule(calendar=XNYS, publish_time=time(16, 30))
+# H.15 rates (e.g. T10Y3M) reach FRED the following business afternoon
+FRED_DAILY = SourceSchedule(calendar=US_FEDERAL, publish_time=time(16, 30), lag_sessions=1)
+# Monthly indicators (e.g. USREC) are posted in the first days of the next month
+FRED_MONTHLY = SourceSchedule(calendar=US_FEDERAL, frequency='monthly', lag_days=7, publish_time=time(9, 0))
+
+
+@dataclass(frozen=True)
+class FetchDecision:
+    """Outcome of planning a single ticker."""
+    ticker: str
+    should_fetch: bool
+    reason: str
+    expected_latest: Optional[pd.Timestamp] = None
+
+
+class FreshnessPlanner:
+    """
+    Plans fetches per ticker against each source's publication schedule.
+
+    Args:
+        schedules: Schedule for each ticker.
+        default: Schedule for tickers not listed in `schedules`. If None,
+            unknown tickers are always fetched.
+    """
+    def __init__(self, schedules: Dict[str, SourceSchedule], default: Optional[SourceSchedule] = None):
+        self.schedules = dict(schedules)
+        self.default = default
+
+    def expected_latest(self, schedule: SourceSchedule, now: pd.Timestamp) -> pd.Timestamp:
+        """Date of the newest observation the source can have published by `now`."""
+        local_now = now.tz_convert(schedule.timezone)
+        today = local_now.normalize().tz_localize(None)
+
+        if schedule.frequency == 'monthly':
+            period = today.to_period('M') - 1
+            while True:
+                published_on = period.end_time.normalize() + pd.Timedelta(days=1 + schedule.lag_days)
+                if self._published(published_on, schedule, local_now):
+                    return period.start_time
+                period -= 1
+
+        if schedule.frequency != 'daily':
+            raise ValueError(f"Unknown frequency: {schedule.frequency}")
+
+        session = today if schedule.calendar.is_session(today) else schedule.calendar.previous_session(today)
+        while True:
+            published_on = session
+            for _ in range(schedule.lag_sessions):
+                published_on = schedule.calendar.next_session(published_on)
+            if self._published(published_on, schedule, local_now):
+                return session
+            session = schedule.calendar.previous_session(session)
+
+    @staticmethod
+    def _published(day: pd.Timestamp, schedule: SourceSchedule, local_now: pd.Timestamp) -> bool:
+        publish_at = (day + pd.Timedelta(hours=schedule.publish_time.hour, minutes=schedule.publish_time.minute))
+        return publish_at.tz_localize(schedule.timezone) <= local_now
+
+    def plan(self, ticker: str, last_date: Optional[pd.Timestamp], now: Optional[pd.Timestamp] = None) -> FetchDecision:
+        """
+        Decides whether fetching `ticker` can possibly return new data.
+
+        Args:
+            ticker: The ticker symbol.
+            last_date: Last stored observation, or None if nothing is stored.
+            now: Current time (tz-aware; naive is taken as UTC). Defaults to now.
+
+        Returns:
+            FetchDecision: The decision, which is also logged.
+        """
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        if now.tzinfo is None:
+            now = now.tz_localize('UTC')
+
+        schedule = self.schedules.get(ticker, self.default)
+        if last_date is None:
+            decision = FetchDecision(ticker, True, "no stored data")
+        elif schedule is None:
+            decision = FetchDecision(ticker, True, "no schedule")
+        else:
+            expected = self.expected_latest(schedule, now)
+            last = pd.Timestamp(last_date).normalize()
+            if last.tzinfo is not None:
+                last = last.tz_localize(None)
+            if schedule.frequency == 'monthly':
+                behind = last.to_period('M') < expected.to_period('M')
+            else:
+                behind = last < expected
+            if behind:
+                reason = f"stored {last:%Y-%m-%d}, source has {expected:%Y-%m-%d}"
+            else:
+                reason = f"up to date ({last:%Y-%m-%d}, next publication not yet due)"
+            decision = FetchDecision(ticker, behind, reason, expected)
+
+        action = "FETCH" if decision.should_fetch else "SKIP"
+        logger.info(f"[plan] {ticker}: {action} - {decision.reason}")
+        return decision
@@ -1,8 +1,10 @@
 import logging
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional
 from market_monitor.data.store import ParquetStore
+from market_monitor.data.freshness import FreshnessPlanner
+from market_monitor.data.validation import DeltaValidator
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -11,13 +13,16 @@ def fetch_and_update(
     ticker: str,
     adapter,
     store: ParquetStore,
-    start_date_default: str
+    start_date_default: str,
+    planner: Optional[FreshnessPlanner] = None,
+    validator: Optional[DeltaValidator] = None
 ) -> pd.DataFrame:
     """
     Fetches data for a ticker using delta logic:
     1. Load existing data.
-    2. Determine start date (Last Date + 1 or Default).
-    3. Fetch new data.
+    2. Determine start date (Last Date + 1 or Default), and skip the fetch if
+       the planner knows the source cannot have published anything newer.
+    3. Fetch new data and validate it against the stored tail.
     4. Merge and Save.
     5. Return full dataframe.
 
@@ -26,6 +31,9 @@ def fetch_and_update(
         adapter: The data adapter instance (YahooFinanceAdapter or FredAdapter).
         store: The ParquetStore instance.
         start_date_default: The default start date if no data exists.
+        planner: Optional FreshnessPlanner consulted before any network call.
+        validator: Optional DeltaValidator; rejected rows are quarantined
+            instead of being merged.
 
     Returns:
         pd.DataFrame: The complete dataframe for the ticker.
@@ -41,6 +49,9 @@ def fetch_and_update(
         # Start from next day
         start_date = (last_date + timedelta(days=1)).strftime('%Y-%m-%d')
         logger.debug(f"Found existing data up to {last_date.strftime('%Y-%m-%d')}. Fetching delta from {start_date}...")
+
+        if planner is not None and not planner.plan(ticker, last_date).should_fetch:
+            return df_existing
     else:
         logger.debug(f"No existing data. Fetching full history from {start_date}...")
         df_existing = pd.DataFrame()
@@ -59,6 +70,9 @@ def fetch_and_update(
         logger.error(f"Error fetching {ticker}: {e}")
         df_new = pd.DataFrame()
 
+    if validator is not None and not df_new.empty:
+        df_new, _ = validator.validate(ticker, df_new, df_existing)
+
     # 3. Merge
     if df_new.empty:
         return df_existing if df_existing is not None else pd.DataFrame()
@@ -0,0 +1,250 @@
+"""
+Multi-frequency resample cache on top of `ParquetStore`.
+
+For each ticker and frequency (weekly, monthly, yearly) the cache stores one
+bar per bucket: OHLC of the daily closes, the bucket-to-bucket log return, the
+running high-water mark and drawdown. The lifetime sigma/MAD of the bucket
+returns are maintained from running sums.
+
+Bars are indexed by the last daily observation in the bucket, so the newest
+bar is the open (still forming) bucket. Closed bars are appended to the store;
+the open bar lives in a JSON state file with the running sums. A delta sync
+recomputes the open bar from the daily rows of its bucket onward, carrying the
+previous bar's close and high-water mark, and appends the buckets that closed;
+closed buckets are never read back or rewritten.
+"""
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_monitor.data.store import ParquetStore
+
+logger = logging.getLogger(__name__)
+
+# Frequency name -> pandas period alias
+FREQUENCIES = {
+    'weekly': 'W-FRI',
+    'monthly': 'M',
+    'yearly': 'Y',
+}
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Log_Return', 'High_Water', 'Drawdown']
+
+
+def resample_prices(
+    prices: pd.Series,
+    freq: str,
+    prev_close: float = np.nan,
+    prev_high_water: float = np.nan
+) -> pd.DataFrame:
+    """
+    Resamples daily prices into bars.
+
+    Args:
+        prices: Daily prices, chronologically ordered.
+        freq: Pandas period alias ('W-FRI', 'M', 'Y').
+        prev_close: Close of the bar preceding `prices` (for the first log return).
+        prev_high_water: High-water mark up to the bar preceding `prices`.
+
+    Returns:
+        pd.DataFrame: One row per bucket with `COLUMNS`, indexed by the last
+                      observation date of the bucket.
+    """
+    prices = prices.dropna()
+    if prices.empty:
+        return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([]))
+
+    periods = prices.index.to_period(freq)
+    bars = prices.groupby(periods).agg(['first', 'max', 'min', 'last'])
+    bars.columns = ['Open', 'High', 'Low', 'Close']
+    bars.index = pd.DatetimeIndex(prices.index.to_series().groupby(periods).last().to_numpy())
+
+    close = bars['Close'].to_numpy(dtype=float)
+    previous = np.concatenate([[prev_close], close[:-1]])
+    high_water = np.fmax.accumulate(np.concatenate([[prev_high_water], close]))[1:]
+    # Quiet like pandas for zero-valued series (e.g. USREC)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bars['Log_Return'] = np.log(close / previous)
+        # Same as calculate_drawdown on the bar closes, continued from the carried mark
+        bars['High_Water'] = high_water
+        bars['Drawdown'] = close / high_water - 1
+    return bars
+
+
+@dataclass
+class _BarStats:
+    """
+    Running sums of closed-bar log returns, taken around a fixed reference mean.
+
+    Sigma is exact (the sums of squares are shifted, not approximated); MAD is
+    taken around the reference mean, which is the lifetime mean when the
+    bars are first built.
+    """
+    count: int = 0
+    reference_mean: float = 0.0
+    deviation: float = 0.0
+    squared_deviation: float = 0.0
+    abs_deviation: float = 0.0
+
+    def add(self, log_returns: np.ndarray):
+        deviations = log_returns[np.isfinite(log_returns)] - self.reference_mean
+        self.count += len(deviations)
+        self.deviation += float(deviations.sum())
+        self.squared_deviation += float((deviations ** 2).sum())
+        self.abs_deviation += float(np.abs(deviations).sum())
+
+    def lifetime(self, open_return: float = np.nan) -> Dict[str, float]:
+        """Lifetime sigma/MAD of the closed-bar returns plus `open_return`."""
+        stats = replace(self)
+        stats.add(np.array([open_return], dtype=float))
+        n = stats.count
+        variance = (stats.squared_deviation - stats.deviation ** 2 / n) / (n - 1) if n > 1 else np.nan
+        return {
+            'lifetime_sigma': float(np.sqrt(max(variance, 0.0))) if n > 1 else np.nan,
+            'lifetime_mad': stats.abs_deviation / n if n else np.nan,
+        }
+
+
+class ResampleCache:
+    """
+    Incrementally maintained weekly/monthly/yearly bars per ticker.
+
+    Closed bars are appended to the store and never read back by an update.
+    The open bar, the close and high-water mark of the last closed bar (the
+    carry for the next recompute) and the running return sums are kept in a
+    JSON state file per `TICKER@frequency` under `.resample/`.
+
+    Args:
+        store: Store holding the closed bars (keyed `TICKER@frequency`).
+        frequencies: Frequency name -> pandas period alias.
+    """
+    def __init__(self, store: ParquetStore, frequencies: Optional[Dict[str, str]] = None):
+        self.store = store
+        self.frequencies = dict(frequencies or FREQUENCIES)
+        self.state_dir = os.path.join(store.cache_dir, '.resample')
+        if not os.path.exists(self.state_dir):
+            os.makedirs(self.state_dir)
+
+    @staticmethod
+    def key(ticker: str, frequency: str) -> str:
+        return f"{ticker}@{frequency}"
+
+    def _state_path(self, key: str) -> str:
+        safe_key = key.replace("^", "").replace("=", "_")
+        return os.path.join(self.state_dir, f"{safe_key}.json")
+
+    def _load_state(self, key: str) -> Dict:
+        try:
+            with open(self._state_path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self, key: str, state: Dict):
+        path = self._state_path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, path)
+
+    def update(self, ticker: str, prices: pd.Series) -> Dict[str, pd.DataFrame]:
+        """
+        Brings every frequency of `ticker` up to date with the daily `prices`.
+
+        Only the open bucket and any newer ones are recomputed: the buckets
+        that closed are appended to the store and their returns added to the
+        running sums. The first update of a ticker (or of a cache without a
+        state file) builds and saves every bar.
+
+        Args:
+            ticker: The ticker symbol.
+            prices: The full daily price history.
+
+        Returns:
+            Dict[str, pd.DataFrame]: The recomputed bars per frequency name
+            (empty if nothing was new); `load` returns all of them.
+        """
+        prices = prices.dropna().sort_index()
+        result = {}
+        for name, freq in self.frequencies.items():
+            key = self.key(ticker, name)
+            state = self._load_state(key)
+
+            if 'open' not in state:
+                bars = resample_prices(prices, freq)
+                returns = bars['Log_Return'].to_numpy(dtype=float)
+                finite = returns[np.isfinite(returns)]
+                stats = _BarStats(reference_mean=float(finite.mean()) if len(finite) else 0.0)
+                previous = None
+                write = self.store.save
+                logger.debug(f"[resample] {key}: built {len(bars)} bars")
+            else:
+                open_bar = _bar_from_state(state['open'])
+                if prices.empty or prices.index[-1] <= open_bar.index[-1]:
+                    result[name] = open_bar.iloc[:0]
+                    continue
+                previous = state['previous']
+                bars = resample_prices(
+                    prices[prices.index >= open_bar.index[-1].to_period(freq).start_time],
+                    freq,
+                    prev_close=previous['Close'] if previous else np.nan,
+                    prev_high_water=previous['High_Water'] if previous else np.nan,
+                )
+                stats = _BarStats(**state['stats'])
+                write = self.store.append
+                logger.debug(f"[resample] {key}: recomputed {len(bars)} open/new bars")
+
+            if bars.empty:
+                result[name] = bars
+                continue
+            closed = bars.iloc[:-1]
+            if not closed.empty:
+                stats.add(closed['Log_Return'].to_numpy(dtype=float))
+                write(closed, key)
+                previous = {column: float(closed[column].iloc[-1]) for column in ('Close', 'High_Water')}
+            self._save_state(key, {
+                'open': _bar_to_state(bars.iloc[-1:]),
+                'previous': previous,
+                'stats': asdict(stats),
+            })
+            result[name] = bars
+        return result
+
+    def load(self, ticker: str, frequency: str) -> Optional[pd.DataFrame]:
+        """The stored bars of `ticker` at `frequency` (closed bars, then the open one), or None."""
+        if frequency not in self.frequencies:
+            raise ValueError(f"Unknown frequency {frequency}; expected one of {list(self.frequencies)}")
+        key = self.key(ticker, frequency)
+        closed = self.store.load(key)
+        state = self._load_state(key)
+        if 'open' not in state:
+            return closed
+        open_bar = _bar_from_state(state['open'])
+        if closed is None or closed.empty:
+            return open_bar
+        open_bar.index = open_bar.index.astype(closed.index.dtype)
+        return pd.concat([closed[COLUMNS], open_bar])
+
+    def stats(self, ticker: str, frequency: str) -> Dict[str, float]:
+        """Lifetime sigma/MAD of the bucket returns of `ticker` at `frequency`."""
+        state = self._load_state(self.key(ticker, frequency))
+        if 'open' not in state:
+            return {}
+        return _BarStats(**state['stats']).lifetime(state['open']['Log_Return'])
+
+
+def _bar_to_state(bar: pd.DataFrame) -> Dict:
+    row = {column: float(bar[column].iloc[0]) for column in COLUMNS}
+    row['Date'] = bar.index[0].isoformat()
+    return row
+
+
+def _bar_from_state(row: Dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        {column: [float(row[column])] for column in COLUMNS},
+        index=pd.DatetimeIndex([pd.Timestamp(row['Date'])]),
+    )
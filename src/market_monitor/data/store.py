@@ -1,11 +1,27 @@
 import os
+import shutil
 import pandas as pd
-from typing import Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Iterator, List, Optional
 from datetime import datetime
 
+# Appended parts kept per ticker before they are merged into one
+MAX_PARTS = 64
+
+
+def _index_columns(schema: pa.Schema) -> List[str]:
+    metadata = schema.pandas_metadata or {}
+    return [c for c in metadata.get('index_columns', []) if isinstance(c, str)]
+
+
 class ParquetStore:
     """
     Local caching mechanism using Parquet files with per-ticker delta updates.
+
+    A ticker is stored as `TICKER.parquet`, written whole by `save`, plus the
+    part files `append` adds under `TICKER.parts/` (delta rows, or entries of
+    an append-only log); reads see both.
     """
     def __init__(self, cache_dir: str = "data_storage"):
         self.cache_dir = cache_dir
@@ -18,28 +34,88 @@ class ParquetStore:
         safe_ticker = ticker.replace("^", "").replace("=", "_")
         return os.path.join(self.cache_dir, f"{safe_ticker}.parquet")
 
+    def _get_partsdir(self, ticker: str) -> str:
+        return self._get_filepath(ticker)[:-len(".parquet")] + ".parts"
+
+    def _get_parts(self, ticker: str) -> List[str]:
+        partsdir = self._get_partsdir(ticker)
+        if not os.path.isdir(partsdir):
+            return []
+        return [os.path.join(partsdir, name) for name in sorted(os.listdir(partsdir)) if name.endswith(".parquet")]
+
+    def _get_files(self, ticker: str) -> List[str]:
+        """The files holding `ticker`, oldest rows first."""
+        filepath = self._get_filepath(ticker)
+        return ([filepath] if os.path.exists(filepath) else []) + self._get_parts(ticker)
+
     def load(self, ticker: str) -> Optional[pd.DataFrame]:
         """Loads data for a specific ticker from cache if it exists."""
-        filepath = self._get_filepath(ticker)
-        if os.path.exists(filepath):
+        files = self._get_files(ticker)
+        if files:
             try:
-                df = pd.read_parquet(filepath)
+                frames = [pd.read_parquet(f) for f in files]
+                df = frames[0] if len(frames) == 1 else pd.concat(frames)
                 # Ensure index is datetime and sorted
                 if not isinstance(df.index, pd.DatetimeIndex):
                     df.index = pd.to_datetime(df.index)
-                df = df.sort_index()
+                # Stable, so repeated dates keep the order they were written in
+                df = df.sort_index(kind='stable')
                 return df
             except Exception as e:
                 print(f"[!] Cache read error for {ticker}: {e}")
                 return None
         return None
 
+    def iter_batches(
+        self,
+        ticker: str,
+        batch_size: int = 65536,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Streams the cached data for a ticker in chronological batches without
+        loading the whole file. Yields nothing if the ticker is not cached.
+
+        Args:
+            ticker: The ticker symbol.
+            batch_size: Maximum rows per batch.
+            columns: Columns to read (the index is always included).
+        """
+        for filepath in self._get_files(ticker):
+            parquet_file = pq.ParquetFile(filepath)
+            read_columns = columns
+            if columns is not None:
+                index_columns = _index_columns(parquet_file.schema_arrow)
+                read_columns = list(columns) + [c for c in index_columns if c not in columns]
+
+            # `save` writes sorted, de-duplicated data and parts only hold newer rows, so batches arrive in order
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=read_columns):
+                df = pa.Table.from_batches([batch]).to_pandas()
+                if not isinstance(df.index, pd.DatetimeIndex):
+                    df.index = pd.to_datetime(df.index)
+                yield df
+
     def get_last_date(self, ticker: str) -> Optional[datetime]:
         """Returns the last available date in the cache for the given ticker."""
-        df = self.load(ticker)
-        if df is not None and not df.empty:
-            return df.index[-1]
-        return None
+        files = self._get_files(ticker)
+        if not files:
+            return None
+        # Only the index of the newest row group is read
+        parquet_file = pq.ParquetFile(files[-1])
+        index_columns = _index_columns(parquet_file.schema_arrow)
+        if parquet_file.num_row_groups == 0 or not index_columns:
+            df = self.load(ticker)
+            return df.index[-1] if df is not None and not df.empty else None
+        table = parquet_file.read_row_group(parquet_file.num_row_groups - 1, columns=index_columns)
+        index = pd.to_datetime(table.to_pandas().index)
+        return index.max() if len(index) else None
+
+    def get_columns(self, ticker: str) -> Optional[pd.Index]:
+        """Returns the stored columns of the given ticker, reading only the schema."""
+        files = self._get_files(ticker)
+        if not files:
+            return None
+        return pq.read_schema(files[0]).empty_table().to_pandas().columns
 
     def save(self, data: pd.DataFrame, ticker: str):
         """Saves or updates data for a specific ticker."""
@@ -59,5 +135,39 @@ class ParquetStore:
             # Remove duplicates just in case
             data = data[~data.index.duplicated(keep='last')]
             data.to_parquet(filepath)
+            # The full dataset supersedes any appended parts
+            shutil.rmtree(self._get_partsdir(ticker), ignore_errors=True)
         except Exception as e:
             print(f"[!] Cache write error for {ticker}: {e}")
+
+    def append(self, data: pd.DataFrame, ticker: str):
+        """
+        Appends `data` as a new part file, without reading or rewriting what
+        is already stored.
+
+        Unlike `save`, nothing is de-duplicated: rows sharing a date with
+        stored ones are kept alongside them, which suits append-only logs.
+        For time series, append only rows newer than the stored ones. Once
+        `MAX_PARTS` parts accumulate they are merged into a single part; the
+        file written by `save` is never rewritten.
+        """
+        if data is None or data.empty:
+            return
+
+        partsdir = self._get_partsdir(ticker)
+        if not os.path.exists(partsdir):
+            os.makedirs(partsdir)
+        parts = self._get_parts(ticker)
+        number = int(os.path.basename(parts[-1])[:-len(".parquet")]) + 1 if parts else 0
+
+        try:
+            data.sort_index(kind='stable').to_parquet(os.path.join(partsdir, f"{number:06d}.parquet"))
+            parts = self._get_parts(ticker)
+            if len(parts) >= MAX_PARTS:
+                merged = pd.concat([pd.read_parquet(f) for f in parts])
+                # Written before the old parts are removed, so an interrupted merge loses nothing
+                merged.to_parquet(os.path.join(partsdir, f"{number + 1:06d}.parquet"))
+                for part in parts:
+                    os.remove(part)
+        except Exception as e:
+            print(f"[!] Cache append error for {ticker}: {e}")
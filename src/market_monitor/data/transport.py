@@ -0,0 +1,403 @@
+"""
+Shared HTTP transport for the data adapters.
+
+Every request made through a `Transport` goes through one pooled
+`requests.Session` and a `TransportAdapter` that:
+
+- waits on a per-host token bucket, so a wide sync stays under each source's
+  rate limit instead of tripping it;
+- retries connection errors, timeouts, 429s and 5xx responses with jittered
+  exponential backoff, honouring `Retry-After` when the server sends one;
+- revalidates previously seen URLs with `If-None-Match` / `If-Modified-Since`
+  and serves the stored body on `304 Not Modified`.
+
+Libraries that bring their own HTTP client (yfinance, which needs curl_cffi)
+get one shared `browser_session` and go through `Transport.call` for the
+rate limits and backoff; they retry only the transient errors they are told.
+"""
+import email.utils
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum burst size.
+        clock: Monotonic clock (injectable for tests).
+        sleep: Sleep function (injectable for tests).
+    """
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes one token, blocking until it is available. Returns the time waited."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now; waiters queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Jittered exponential backoff.
+
+    Attributes:
+        max_retries: Retries after the first attempt.
+        backoff_base: Cap of the first delay, in seconds; doubles per retry.
+        backoff_max: Upper bound of any single delay (including Retry-After).
+        retry_statuses: HTTP statuses that are retried.
+    """
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number `attempt` (0-based), "full jitter" unless the server asked."""
+        if retry_after is not None:
+            return min(self.backoff_max, max(0.0, retry_after))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+class TransientHTTPError(Exception):
+    """A retryable HTTP status seen by `Transport.call` (see `RetryPolicy.retry_statuses`)."""
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+# What `Transport.call` retries unless told otherwise
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (requests.ConnectionError, requests.Timeout, TransientHTTPError)
+
+
+class ConditionalCache:
+    """
+    Validators and bodies of GET responses, for conditional requests.
+
+    Held in memory; with a `directory`, also persisted so that a later run
+    can revalidate instead of downloading the full body again. Entries are
+    keyed by URL, and URLs that embed a moving date range (e.g. FRED's
+    `cosd`) produce a new one per run, so at most `max_entries` are kept,
+    evicting the least recently used (by file mtime on disk).
+
+    Args:
+        directory: Optional directory for the persisted entries.
+        max_entries: Entries kept in memory and on disk.
+    """
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 256):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        name = hashlib.sha256(url.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f"{name}.json"), os.path.join(self.directory, f"{name}.body")
+
+    def _remember(self, url: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+        if entry is not None or not self.directory:
+            return entry
+
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                entry = json.load(f)
+            with open(body_path, "rb") as f:
+                entry["content"] = f.read()
+            os.utime(meta_path) # Recently used
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        self._remember(url, entry)
+        return entry
+
+    def put(self, url: str, response: requests.Response):
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() in ("etag", "last-modified", "content-type")}
+        self._remember(url, {"headers": headers, "content": response.content})
+        if self.directory:
+            meta_path, body_path = self._paths(url)
+            with open(body_path, "wb") as f:
+                f.write(response.content)
+            with open(meta_path, "w") as f:
+                json.dump({"url": url, "headers": headers}, f)
+            self._prune()
+
+    def _prune(self):
+        """Removes the least recently used persisted entries beyond `max_entries`."""
+        metas = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    metas.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+        metas.sort()
+        for _, meta_path in metas[:max(0, len(metas) - self.max_entries)]:
+            for path in (meta_path, meta_path[:-len(".json")] + ".body"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+class TransportAdapter(HTTPAdapter):
+    """
+    `HTTPAdapter` adding rate limiting, retries and conditional requests.
+
+    Args:
+        transport: The owning Transport (rate limits, policy, cache).
+        **kwargs: Passed to HTTPAdapter (e.g. pool sizes).
+    """
+    def __init__(self, transport: "Transport", **kwargs):
+        self.transport = transport
+        super().__init__(max_retries=0, **kwargs)
+
+    def send(self, request, **kwargs):
+        transport = self.transport
+        host = urlsplit(request.url).netloc
+        cached = transport.cache.get(request.url) if request.method == "GET" else None
+        if cached is not None:
+            validators = {k.lower(): v for k, v in cached["headers"].items()}
+            if "etag" in validators:
+                request.headers["If-None-Match"] = validators["etag"]
+            if "last-modified" in validators:
+                request.headers["If-Modified-Since"] = validators["last-modified"]
+
+        attempt = 0
+        while True:
+            transport.bucket(host).acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= transport.policy.max_retries:
+                    raise
+                delay = transport.policy.delay(attempt)
+                logger.debug(f"[http] {host}: {type(e).__name__}, retry {attempt + 1} in {delay:.2f}s")
+            else:
+                if response.status_code not in transport.policy.retry_statuses or attempt >= transport.policy.max_retries:
+                    return self._finish(request, response, cached)
+                delay = transport.policy.delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                logger.debug(f"[http] {host}: HTTP {response.status_code}, retry {attempt + 1} in {delay:.2f}s")
+                response.close()
+            transport.sleep(delay)
+            attempt += 1
+
+    def _finish(self, request, response: requests.Response, cached: Optional[Dict[str, Any]]) -> requests.Response:
+        if response.status_code == 304 and cached is not None:
+            logger.debug(f"[http] {request.url}: not modified")
+            response.close()
+            replay = requests.Response()
+            replay.status_code = 200
+            replay.reason = "OK (revalidated)"
+            replay.headers = CaseInsensitiveDict(cached["headers"])
+            replay._content = cached["content"]
+            replay.url = request.url
+            replay.request = request
+            replay.connection = self
+            return replay
+
+        if request.method == "GET" and response.status_code == 200 and (
+            "ETag" in response.headers or "Last-Modified" in response.headers
+        ):
+            self.transport.cache.put(request.url, response)
+        return response
+
+
+class _SharedSession(requests.Session):
+    """Session whose `close` is a no-op, as readers that own a session close it after each read."""
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+
+class Transport:
+    """
+    Pooled session, per-host rate limits and retry policy, shared by adapters.
+
+    Args:
+        rate_limits: (requests per second, burst) per host.
+        default_rate_limit: (requests per second, burst) for unlisted hosts.
+        policy: Retry policy.
+        cache_dir: Directory persisting conditional-request validators.
+        cache_entries: Conditional-request entries kept (least recently used evicted).
+        pool_maxsize: Connections kept open per host.
+        sleep: Sleep function used between retries (injectable for tests).
+    """
+    def __init__(
+        self,
+        rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        default_rate_limit: Tuple[float, float] = (5.0, 5.0),
+        policy: Optional[RetryPolicy] = None,
+        cache_dir: Optional[str] = None,
+        cache_entries: int = 256,
+        pool_maxsize: int = 10,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.default_rate_limit = default_rate_limit
+        self.policy = policy or RetryPolicy()
+        self.cache = ConditionalCache(cache_dir, cache_entries)
+        self.sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._browser_session = None
+
+        self.session = _SharedSession()
+        adapter = TransportAdapter(self, pool_connections=10, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.rate_limits.get(host, self.default_rate_limit)
+                self._buckets[host] = TokenBucket(rate, burst, sleep=self.sleep)
+            return self._buckets[host]
+
+    def browser_session(self):
+        """
+        One shared curl_cffi session (browser TLS fingerprint), created on first use.
+
+        For clients that cannot use `session`, e.g. yfinance; its connections
+        are pooled across every call made with it.
+        """
+        with self._lock:
+            if self._browser_session is None:
+                from curl_cffi import requests as curl_requests
+                self._browser_session = curl_requests.Session(impersonate="chrome")
+            return self._browser_session
+
+    def call(
+        self,
+        host: str,
+        func: Callable[..., Any],
+        *args,
+        retry_on: Tuple[Type[BaseException], ...] = (),
+        **kwargs
+    ) -> Any:
+        """
+        Runs `func` under `host`'s rate limit, retrying transient failures.
+
+        `TRANSIENT_ERRORS` are retried, as are responses returned by `func`
+        with a status in `policy.retry_statuses`; `retry_on` adds the
+        transient errors of the client being called. Anything else (including
+        programming errors) propagates at once.
+        """
+        retryable = TRANSIENT_ERRORS + tuple(retry_on)
+        attempt = 0
+        while True:
+            self.bucket(host).acquire()
+            try:
+                result = func(*args, **kwargs)
+                status = getattr(result, 'status_code', None)
+                if status in self.policy.retry_statuses and attempt < self.policy.max_retries:
+                    raise TransientHTTPError(status, parse_retry_after(result.headers.get('Retry-After')))
+                return result
+            except retryable as e:
+                if attempt >= self.policy.max_retries:
+                    raise
+                delay = self.policy.delay(attempt, getattr(e, 'retry_after', None))
+                logger.debug(f"[http] {host}: {type(e).__name__}, retry {attempt + 1} in {delay:.2f}s")
+                self.sleep(delay)
+                attempt += 1
+
+    def close(self):
+        self.session.shutdown()
+        with self._lock:
+            if self._browser_session is not None:
+                self._browser_session.close()
+                self._browser_session = None
+
+
+# Conservative limits for the public endpoints used by the adapters
+DEFAULT_RATE_LIMITS = {
+    "fred.stlouisfed.org": (2.0, 4.0),
+    "query1.finance.yahoo.com": (1.0, 2.0),
+    "query2.finance.yahoo.com": (1.0, 2.0),
+}
+
+_default_transport: Optional[Transport] = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> Transport:
+    """The process-wide Transport used by adapters created without one."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = Transport()
+        return _default_transport
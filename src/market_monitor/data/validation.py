@@ -0,0 +1,286 @@
+"""
+Data-quality validation of delta rows at ingestion.
+
+`fetch_and_update` only ever appends newly fetched rows to a stored history
+that was itself validated when it was appended, so only the delta needs to be
+checked, against the stored tail. The checks are vectorized over the delta:
+
+- missing values (SPEC: gaps are filled or dropped explicitly; here dropped);
+- non-positive prices (SPEC: treated as errors);
+- dates at or before the stored tail, duplicated or out of order;
+- implausible jumps: |log return| beyond `jump_mads` lifetime MADs, measured
+  from the last accepted price. A run of consecutive jumps that agree with
+  each other is a level shift rather than bad prints: once it is
+  `reanchor_rows` long it is accepted and the check re-anchors on it;
+- calendar gaps: sessions with no row at all (reported, not quarantined; the
+  aligned frame forward-fills them).
+
+Rejected rows are quarantined in the store under `TICKER@quarantine` with the
+reason and time; the quarantine is append-only, so a date rejected on several
+runs (or twice in one delta) keeps every entry. A per-ticker quality report is written to `.quality/` in the cache
+directory. The lifetime MAD used for the jump check is maintained from running
+sums in that report, so the full history is only read once per ticker.
+"""
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from market_monitor.data.calendars import TradingCalendar
+from market_monitor.data.store import ParquetStore
+
+logger = logging.getLogger(__name__)
+
+# Reasons, in order of precedence
+MISSING = "missing"
+NON_POSITIVE = "non_positive"
+STALE_DATE = "stale_date"
+DUPLICATE_DATE = "duplicate_date"
+OUT_OF_ORDER = "out_of_order"
+JUMP = "jump"
+
+HISTORY_LENGTH = 50 # Reports kept per ticker
+TAIL_ROWS = 10 # Stored rows searched for the last valid price
+
+
+@dataclass(frozen=True)
+class QualityRules:
+    """
+    Checks applied to a ticker.
+
+    Attributes:
+        positive: Values are prices; zero or negative values are errors.
+        calendar: Calendar whose sessions are expected; None skips gap checks.
+        jump_mads: Largest plausible |log return| in lifetime MADs; None
+            skips the jump check (e.g. for rates, which are not prices).
+        min_history: Returns needed before the jump check applies.
+        reanchor_rows: Consecutive jumps from the last accepted price that
+            agree with each other (within `jump_mads`) after which they are
+            taken as a level shift and accepted. Rejected rows are fetched
+            again with the next delta, so the run can span several syncs.
+    """
+    positive: bool = True
+    calendar: Optional[TradingCalendar] = None
+    jump_mads: Optional[float] = 50.0
+    min_history: int = 250
+    reanchor_rows: int = 3
+
+
+@dataclass
+class QualityReport:
+    """Outcome of validating one delta."""
+    ticker: str
+    checked_at: str
+    rows_received: int
+    rows_accepted: int
+    issues: Dict[str, int] = field(default_factory=dict)
+    missing_sessions: List[str] = field(default_factory=list)
+
+    @property
+    def rows_quarantined(self) -> int:
+        return self.rows_received - self.rows_accepted
+
+
+@dataclass
+class _ReturnStats:
+    """Running sums of accepted log returns; MAD is taken around a fixed reference mean."""
+    count: int = 0
+    total: float = 0.0
+    reference_mean: float = 0.0
+    abs_deviation: float = 0.0
+
+    @property
+    def mad(self) -> float:
+        return self.abs_deviation / self.count if self.count else np.nan
+
+    def add(self, log_returns: np.ndarray):
+        log_returns = log_returns[np.isfinite(log_returns)]
+        self.count += len(log_returns)
+        self.total += float(log_returns.sum())
+        self.abs_deviation += float(np.abs(log_returns - self.reference_mean).sum())
+
+    @classmethod
+    def from_history(cls, prices: np.ndarray) -> "_ReturnStats":
+        prices = prices[np.isfinite(prices) & (prices > 0)]
+        log_returns = np.log(prices[1:] / prices[:-1])
+        stats = cls(reference_mean=float(log_returns.mean()) if len(log_returns) else 0.0)
+        stats.add(log_returns)
+        return stats
+
+
+def _value_column(df: pd.DataFrame, ticker: str) -> str:
+    return ticker if ticker in df.columns else df.columns[0]
+
+
+class DeltaValidator:
+    """
+    Validates newly fetched rows against the stored tail.
+
+    Args:
+        store: Store holding the histories and the quarantine.
+        rules: Rules per ticker.
+        default: Rules for tickers not in `rules`; None accepts them unchecked.
+    """
+    def __init__(
+        self,
+        store: ParquetStore,
+        rules: Dict[str, QualityRules],
+        default: Optional[QualityRules] = None
+    ):
+        self.store = store
+        self.rules = dict(rules)
+        self.default = default
+        self.report_dir = os.path.join(store.cache_dir, '.quality')
+        if not os.path.exists(self.report_dir):
+            os.makedirs(self.report_dir)
+
+    @staticmethod
+    def quarantine_key(ticker: str) -> str:
+        return f"{ticker}@quarantine"
+
+    def _report_path(self, ticker: str) -> str:
+        safe_ticker = ticker.replace("^", "").replace("=", "_")
+        return os.path.join(self.report_dir, f"{safe_ticker}.json")
+
+    def load_state(self, ticker: str) -> Dict:
+        """The stored quality state of `ticker`: 'stats', 'last' report and 'history'."""
+        try:
+            with open(self._report_path(ticker)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self, ticker: str, state: Dict):
+        path = self._report_path(ticker)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, path)
+
+    def validate(
+        self,
+        ticker: str,
+        df_new: pd.DataFrame,
+        df_existing: Optional[pd.DataFrame]
+    ) -> Tuple[pd.DataFrame, Optional[QualityReport]]:
+        """
+        Splits `df_new` into accepted rows and quarantined rows.
+
+        Args:
+            ticker: The ticker symbol.
+            df_new: Newly fetched rows.
+            df_existing: The stored history (only its tail is used, plus a
+                one-time pass to seed the lifetime MAD).
+
+        Returns:
+            Tuple[pd.DataFrame, Optional[QualityReport]]: The accepted rows and
+            the report (None if the ticker has no rules).
+        """
+        rules = self.rules.get(ticker, self.default)
+        if rules is None or df_new.empty:
+            return df_new, None
+
+        column = _value_column(df_new, ticker)
+        values = pd.to_numeric(df_new[column], errors='coerce').to_numpy(dtype=float)
+        dates = df_new.index.to_numpy(dtype='datetime64[ns]')
+        has_tail = df_existing is not None and not df_existing.empty
+
+        # Row-wise checks
+        checks = [(MISSING, np.isnan(values))]
+        if rules.positive:
+            with np.errstate(invalid='ignore'):
+                checks.append((NON_POSITIVE, values <= 0))
+        if has_tail:
+            checks.append((STALE_DATE, dates <= df_existing.index[-1].to_datetime64()))
+        checks.append((DUPLICATE_DATE, df_new.index.duplicated(keep='last')))
+        previous_max = np.maximum.accumulate(dates)
+        checks.append((OUT_OF_ORDER, np.concatenate([[False], dates[1:] < previous_max[:-1]])))
+
+        reasons = np.select([mask for _, mask in checks], [name for name, _ in checks], default='')
+        rejected = reasons != ''
+
+        # Jumps, measured from the last accepted price
+        state = self.load_state(ticker)
+        stats = _ReturnStats(**state['stats']) if 'stats' in state else None
+        last_price = np.nan
+        if rules.positive and has_tail:
+            stored = df_existing[_value_column(df_existing, ticker)]
+            if stats is None:
+                # One-time seed from the stored history
+                stats = _ReturnStats.from_history(pd.to_numeric(stored, errors='coerce').to_numpy(dtype=float))
+            tail_values = pd.to_numeric(stored.iloc[-TAIL_ROWS:], errors='coerce').to_numpy(dtype=float)
+            valid_tail = tail_values[np.isfinite(tail_values) & (tail_values > 0)]
+            last_price = valid_tail[-1] if len(valid_tail) else np.nan
+        if stats is None:
+            stats = _ReturnStats()
+
+        level_shift = 0
+        if rules.jump_mads is not None and stats.count >= rules.min_history and np.isfinite(last_price):
+            limit = rules.jump_mads * stats.mad
+            # Rejected rows do not move the anchor, so the row reverting a spike is not penalized
+            anchor = last_price
+            run: List[int] = []
+            for i in np.flatnonzero(~rejected):
+                if abs(np.log(values[i] / anchor) - stats.reference_mean) <= limit:
+                    anchor, run = values[i], []
+                    continue
+                if run and abs(np.log(values[i] / values[run[-1]]) - stats.reference_mean) > limit:
+                    run = []
+                run.append(i)
+                rejected[i], reasons[i] = True, JUMP
+                if len(run) >= rules.reanchor_rows:
+                    rejected[run], reasons[run] = False, ''
+                    level_shift += len(run)
+                    anchor, run = values[i], []
+
+        accepted_df = df_new[~rejected]
+        quarantined = df_new[rejected].copy()
+
+        # Running return stats over the accepted rows
+        if rules.positive and not accepted_df.empty:
+            accepted_values = values[~rejected]
+            chain = np.concatenate([[last_price], accepted_values]) if np.isfinite(last_price) else accepted_values
+            stats.add(np.log(chain[1:] / chain[:-1]))
+
+        # Calendar gaps between the stored tail and the newest accepted row
+        missing_sessions: List[str] = []
+        if rules.calendar is not None and not accepted_df.empty:
+            start = (df_existing.index[-1] + pd.Timedelta(days=1)) if has_tail else accepted_df.index[0]
+            expected = rules.calendar.sessions(start.normalize(), accepted_df.index[-1].normalize())
+            gaps = expected.difference(accepted_df.index.normalize())
+            missing_sessions = [d.strftime('%Y-%m-%d') for d in gaps]
+
+        issues = {str(name): int((reasons == name).sum()) for name in np.unique(reasons[rejected])}
+        if missing_sessions:
+            issues['missing_session'] = len(missing_sessions)
+        if level_shift:
+            issues['level_shift'] = level_shift
+        report = QualityReport(
+            ticker=ticker,
+            checked_at=pd.Timestamp.now(tz='UTC').isoformat(),
+            rows_received=len(df_new),
+            rows_accepted=len(accepted_df),
+            issues=issues,
+            missing_sessions=missing_sessions,
+        )
+
+        if level_shift:
+            logger.warning(f"[quality] {ticker}: accepted {level_shift} rows as a level shift")
+        if not quarantined.empty:
+            quarantined['Reason'] = reasons[rejected]
+            quarantined['Quarantined_At'] = report.checked_at
+            # Appended, never de-duplicated: the quarantine is the audit trail
+            self.store.append(quarantined, self.quarantine_key(ticker))
+            logger.warning(f"[quality] {ticker}: quarantined {report.rows_quarantined}/{report.rows_received} rows {issues}")
+        elif missing_sessions:
+            logger.info(f"[quality] {ticker}: {len(missing_sessions)} session(s) without data")
+        else:
+            logger.debug(f"[quality] {ticker}: {report.rows_accepted} rows accepted")
+
+        history = (state.get('history', []) + [asdict(report)])[-HISTORY_LENGTH:]
+        self._save_state(ticker, {'ticker': ticker, 'stats': asdict(stats), 'last': asdict(report), 'history': history})
+        return accepted_df, report
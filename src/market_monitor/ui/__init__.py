@@ -1,8 +1,9 @@
 """
 User interface components for Extremistan.
 
-Currently contains Matplotlib-based dashboards for visualizing fragility
-metrics.
+Contains Matplotlib-based dashboards for visualizing fragility metrics (static
+and incrementally updated), the reporters (console text, JSON Lines, Arrow
+IPC stream), and a level-of-detail tile server for interactive exploration.
 """
 
-__all__ = ["dashboard"]
+__all__ = ["dashboard", "live_dashboard", "reporter", "tile_server"]
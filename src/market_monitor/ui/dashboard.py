@@ -1,7 +1,12 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import Protocol
+from typing import Optional, Protocol, Tuple
+from market_monitor.analytics.math_lib import classify_mad_tiers
+
+FIGSIZE = (14, 16)
+# Marker size and z-order per MAD tier (Track 2)
+OUTLIER_STYLE = {5: (15, 3), 7: (30, 4), 10: (50, 5)}
 
 class Dashboard(Protocol):
     def render(self, df: pd.DataFrame, context: dict):
@@ -13,6 +18,22 @@ class MatplotlibDashboard:
     Visualizes Raw Log Returns, Outliers, and Drawdown.
     """
     def render(self, df: pd.DataFrame, context: dict):
+        fig = plt.figure(figsize=FIGSIZE)
+        if self.draw(fig, df, context) is None:
+            plt.close(fig)
+            return
+
+        plt.tight_layout()
+        plt.show()
+
+    def draw(self, fig: plt.Figure, df: pd.DataFrame, context: dict) -> Optional[Tuple[plt.Axes, ...]]:
+        """
+        Draws the 4 tracks into `fig`.
+
+        Returns:
+            The axes (price, VIX, returns, drawdown, slope), or None if a
+            required column is missing.
+        """
         # Unpack context
         lifetime_mad = context.get('lifetime_mad', 1)
 
@@ -21,13 +42,12 @@ class MatplotlibDashboard:
         for col in required:
             if col not in df.columns:
                 print(f"Error: Missing column {col} for plotting.")
-                return
+                return None
 
         # Setup Plot (4 Tracks)
         # Ratio: 2:2:1:1
-        fig, (ax0, ax1, ax2, ax3) = plt.subplots(
+        ax0, ax1, ax2, ax3 = fig.subplots(
             4, 1,
-            figsize=(14, 16),
             sharex=True,
             gridspec_kw={'height_ratios': [2, 2, 1, 1]}
         )
@@ -88,19 +108,14 @@ class MatplotlibDashboard:
         mad_10 = 10 * lifetime_mad
 
         # Masks
-        abs_ret = df['Log_Return'].abs()
-
-        # > 10 MAD
-        mask_10_pos = (df['Log_Return'] > mad_10)
-        mask_10_neg = (df['Log_Return'] < -mad_10)
-
-        # > 7 MAD (exclusive of 10)
-        mask_7_pos = (df['Log_Return'] > mad_7) & (~mask_10_pos)
-        mask_7_neg = (df['Log_Return'] < -mad_7) & (~mask_10_neg)
+        tier = classify_mad_tiers(df['Log_Return'], lifetime_mad)
 
-        # > 5 MAD (exclusive of 7 and 10)
-        mask_5_pos = (df['Log_Return'] > mad_5) & (~mask_7_pos) & (~mask_10_pos)
-        mask_5_neg = (df['Log_Return'] < -mad_5) & (~mask_7_neg) & (~mask_10_neg)
+        mask_10_pos = (tier == 10)
+        mask_10_neg = (tier == -10)
+        mask_7_pos = (tier == 7)
+        mask_7_neg = (tier == -7)
+        mask_5_pos = (tier == 5)
+        mask_5_neg = (tier == -5)
 
         # Normal
         mask_outliers = mask_10_pos | mask_10_neg | mask_7_pos | mask_7_neg | mask_5_pos | mask_5_neg
@@ -113,19 +128,19 @@ class MatplotlibDashboard:
         # Plot Outliers (Signal)
         # Positive (Blue)
         ax1.scatter(df.index[mask_5_pos], df['Log_Return'][mask_5_pos],
-                   color='blue', s=15, alpha=1.0, zorder=3, label='> +5 MAD')
+                   color='blue', s=OUTLIER_STYLE[5][0], alpha=1.0, zorder=OUTLIER_STYLE[5][1], label='> +5 MAD')
         ax1.scatter(df.index[mask_7_pos], df['Log_Return'][mask_7_pos],
-                   color='blue', s=30, alpha=1.0, zorder=4, label='> +7 MAD')
+                   color='blue', s=OUTLIER_STYLE[7][0], alpha=1.0, zorder=OUTLIER_STYLE[7][1], label='> +7 MAD')
         ax1.scatter(df.index[mask_10_pos], df['Log_Return'][mask_10_pos],
-                   color='blue', s=50, alpha=1.0, zorder=5, label='> +10 MAD')
+                   color='blue', s=OUTLIER_STYLE[10][0], alpha=1.0, zorder=OUTLIER_STYLE[10][1], label='> +10 MAD')
 
         # Negative (Red)
         ax1.scatter(df.index[mask_5_neg], df['Log_Return'][mask_5_neg],
-                   color='red', s=15, alpha=1.0, zorder=3, label='< -5 MAD')
+                   color='red', s=OUTLIER_STYLE[5][0], alpha=1.0, zorder=OUTLIER_STYLE[5][1], label='< -5 MAD')
         ax1.scatter(df.index[mask_7_neg], df['Log_Return'][mask_7_neg],
-                   color='red', s=30, alpha=1.0, zorder=4, label='< -7 MAD')
+                   color='red', s=OUTLIER_STYLE[7][0], alpha=1.0, zorder=OUTLIER_STYLE[7][1], label='< -7 MAD')
         ax1.scatter(df.index[mask_10_neg], df['Log_Return'][mask_10_neg],
-                   color='red', s=50, alpha=1.0, zorder=5, label='< -10 MAD')
+                   color='red', s=OUTLIER_STYLE[10][0], alpha=1.0, zorder=OUTLIER_STYLE[10][1], label='< -10 MAD')
 
         # Reference Lines
         for level, color in zip([mad_5, mad_7, mad_10], ['blue', 'blue', 'blue']):
@@ -193,5 +208,4 @@ class MatplotlibDashboard:
         by_label = dict(zip(labels, handles))
         ax3.legend(by_label.values(), by_label.keys(), loc='upper left')
 
-        plt.tight_layout()
-        plt.show()
+        return ax0, ax0_right, ax1, ax2, ax3
@@ -0,0 +1,252 @@
+"""
+Live dashboard: incremental re-rendering for streaming updates.
+
+`MatplotlibDashboard.render` rebuilds all four tracks from the full history,
+which for a century of daily bars means re-rasterizing tens of thousands of
+points to add one. `LiveDashboard` draws the history once, caches the
+rendered canvas as a background bitmap, and on each update restores that
+bitmap and blits only the new rows (the next price, VIX, drawdown and slope
+segments, and the new return dots, classified against the current lifetime
+MAD). The blitted rows are drawn by a fixed set of artists, one per series,
+whose data is replaced on each update, so a frame costs the same however long
+the session runs; a second set holding every row since the last full redraw
+is only drawn when the whole canvas is (e.g. after a resize).
+
+A full redraw happens only when the static layers are no longer valid: the
+lifetime MAD has moved far enough that the threshold lines and historical
+tiers are stale, or a new value falls outside the current axis limits.
+"""
+from typing import List, Optional
+
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
+import numpy as np
+import pandas as pd
+
+from market_monitor.analytics.math_lib import classify_mad_tiers
+from market_monitor.ui.dashboard import FIGSIZE, OUTLIER_STYLE, MatplotlibDashboard
+
+FULL = "full"
+BLIT = "blit"
+NOOP = "noop"
+
+
+class LiveDashboard(MatplotlibDashboard):
+    """
+    A dashboard that keeps its figure and artists between updates.
+
+    Call `render` once with the history, then `update` with the extended
+    frame as new bars arrive. Use an interactive backend (or `plt.ion()`) to
+    see the figure; on non-interactive backends the canvas is still kept up
+    to date, e.g. for `fig.savefig`.
+
+    Args:
+        headroom: Fraction of the visible time span left empty to the right
+            of the last bar, so new bars fit without rescaling the x axis.
+        mad_tolerance: Relative change of the lifetime MAD that triggers a
+            full redraw (threshold lines and historical tiers are redrawn).
+    """
+    def __init__(self, headroom: float = 0.02, mad_tolerance: float = 0.01):
+        self.headroom = headroom
+        self.mad_tolerance = mad_tolerance
+        self.fig: Optional[plt.Figure] = None
+        self.axes = None
+        self.full_redraws = 0
+        self._background = None
+        self._delta: Optional[_LiveLayers] = None
+        self._history: Optional[_LiveLayers] = None
+        self._live_rows = pd.DataFrame()
+        self._live_tiers = np.zeros(0, dtype=int)
+        self._stale = False
+        self._last_row: Optional[pd.Series] = None
+        self._mad = np.nan
+        self._vix_min = np.nan
+
+    def render(self, df: pd.DataFrame, context: dict):
+        """Draws the full history and caches the background."""
+        self._full_redraw(df, context)
+        return self.fig
+
+    def update(self, df: pd.DataFrame, context: dict) -> str:
+        """
+        Brings the figure up to date with `df`.
+
+        Args:
+            df: The full analytics frame, including rows already drawn.
+            context: As for `render`; 'lifetime_mad' classifies new outliers.
+
+        Returns:
+            str: 'blit' if only the new rows were drawn, 'full' if the figure
+                 was redrawn, 'noop' if there was nothing new.
+        """
+        if self.fig is None or self.axes is None:
+            self._full_redraw(df, context)
+            return FULL
+
+        new = df[df.index > self._last_row.name]
+        if new.empty:
+            return NOOP
+
+        lifetime_mad = context.get('lifetime_mad', 1)
+        if abs(lifetime_mad - self._mad) > self.mad_tolerance * abs(self._mad) or not self._fits(new):
+            self._full_redraw(df, context)
+            return FULL
+
+        # Include the last drawn row so the line segments connect
+        self._draw_segment(df[df.index >= self._last_row.name], new, lifetime_mad)
+        self._last_row = df.iloc[-1]
+        return BLIT
+
+    # -- Full redraw ---------------------------------------------------------
+
+    def _full_redraw(self, df: pd.DataFrame, context: dict):
+        if self.fig is None:
+            self.fig = plt.figure(figsize=FIGSIZE)
+            self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        else:
+            self.fig.clf()
+        self._delta = self._history = None
+        self._background = None
+
+        self.axes = self.draw(self.fig, df, context)
+        if self.axes is None:
+            return
+
+        first, last = df.index[0], df.index[-1]
+        self.axes[0].set_xlim(first, last + (last - first) * self.headroom)
+        # Freeze the y limits so the blitted artists never rescale the axes
+        for ax in self.axes:
+            ax.set_ylim(ax.get_ylim())
+        self.fig.tight_layout()
+
+        self._last_row = df.iloc[-1]
+        self._mad = context.get('lifetime_mad', 1)
+        self._vix_min = df['VIX'].min()
+        # Rows blitted since this redraw, starting at the last drawn row so the lines connect
+        self._live_rows = df.iloc[-1:]
+        self._live_tiers = np.zeros(0, dtype=int)
+        self._stale = False
+        self._delta = self._make_layers()
+        self._history = self._make_layers()
+        self.full_redraws += 1
+        self.fig.canvas.draw()
+
+    def _on_draw(self, event):
+        """Re-captures the background after any full canvas draw (incl. resizes)."""
+        if self._history is not None and len(self._live_rows) > 1:
+            if self._stale:
+                self._history.set_data(self._live_rows, self._live_rows.iloc[1:], self._live_tiers, self._vix_min)
+                self._stale = False
+            for artist in self._history.artists:
+                self.fig.draw_artist(artist)
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _fits(self, new: pd.DataFrame) -> bool:
+        """True if every new value lies within the current axis limits."""
+        ax0, ax0_right, ax1, ax2, ax3 = self.axes
+        if mdates.date2num(new.index[-1]) > ax0.get_xlim()[1]:
+            return False
+
+        for ax, values in [
+            (ax0, new['SPX']),
+            (ax0_right, new['VIX']),
+            (ax1, new['Log_Return']),
+            (ax2, new['Drawdown'] * 100),
+            (ax3, new['Slope']),
+        ]:
+            values = values.dropna()
+            low, high = ax.get_ylim()
+            if not values.empty and (values.min() < low or values.max() > high):
+                return False
+        return True
+
+    # -- Incremental draw ----------------------------------------------------
+
+    def _make_layers(self) -> "_LiveLayers":
+        ax0, ax0_right, ax1, ax2, ax3 = self.axes
+        return _LiveLayers(ax0, ax0_right, ax1, ax2, ax3)
+
+    def _draw_segment(self, seg: pd.DataFrame, new: pd.DataFrame, lifetime_mad: float):
+        tiers = classify_mad_tiers(new['Log_Return'], lifetime_mad).to_numpy()
+        self._delta.set_data(seg, new, tiers, self._vix_min)
+
+        canvas = self.fig.canvas
+        if self._background is not None:
+            canvas.restore_region(self._background)
+        for artist in self._delta.artists:
+            self.fig.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+        # The new segments become part of the background for the next update;
+        # the history layers only catch up when the whole canvas is redrawn
+        self._live_rows = pd.concat([self._live_rows, new])
+        self._live_tiers = np.concatenate([self._live_tiers, tiers])
+        self._stale = True
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+
+
+def _fill_polygons(x: np.ndarray, upper: np.ndarray, lower: np.ndarray, where: Optional[np.ndarray] = None) -> List[np.ndarray]:
+    """The polygons of `fill_between(x, upper, lower, where)`: one per run of finite, selected points."""
+    mask = np.isfinite(upper) & np.isfinite(lower)
+    if where is not None:
+        mask &= where
+    edges = np.flatnonzero(np.diff(np.concatenate([[False], mask, [False]]).astype(np.int8)))
+    polygons = []
+    for begin, end in zip(edges[::2], edges[1::2]):
+        run = slice(begin, end)
+        polygons.append(np.column_stack([
+            np.concatenate([x[run], x[run][::-1]]),
+            np.concatenate([upper[run], lower[run][::-1]]),
+        ]))
+    return polygons
+
+
+class _LiveLayers:
+    """
+    One animated artist per series of the incremental draw.
+
+    The artists are created empty and re-pointed at new data with
+    `set_data` / `set_offsets` / `set_verts`, so drawing them costs the same
+    whatever the number of updates since the last full redraw.
+    """
+    def __init__(self, ax0, ax0_right, ax1, ax2, ax3):
+        self.spx = ax0.plot([], [], color='black', linewidth=1, animated=True)[0]
+        self.vix = PolyCollection([], facecolor='purple', alpha=0.2, zorder=0, animated=True)
+        ax0_right.add_collection(self.vix, autolim=False)
+        self.drawdown_fill = PolyCollection([], facecolor='red', alpha=0.3, animated=True)
+        ax2.add_collection(self.drawdown_fill, autolim=False)
+        self.drawdown = ax2.plot([], [], color='darkred', linewidth=0.8, animated=True)[0]
+        self.slope = ax3.plot([], [], color='#4572A7', linewidth=1.5, animated=True)[0]
+        self.recession = PolyCollection([], facecolor='#e0e0e0', alpha=0.5, zorder=0,
+                                        transform=ax3.get_xaxis_transform(), animated=True)
+        ax3.add_collection(self.recession, autolim=False)
+
+        # Return dots per signed MAD tier
+        self.dots = {0: ax1.scatter([], [], color='gray', s=1, alpha=0.1, zorder=1, animated=True)}
+        for level, (size, zorder) in OUTLIER_STYLE.items():
+            for signed, color in ((level, 'blue'), (-level, 'red')):
+                self.dots[signed] = ax1.scatter([], [], color=color, s=size, alpha=1.0, zorder=zorder, animated=True)
+
+        self.artists = [self.vix, self.recession, self.drawdown_fill, self.spx, self.drawdown, self.slope,
+                        *self.dots.values()]
+
+    def set_data(self, seg: pd.DataFrame, points: pd.DataFrame, tiers: np.ndarray, vix_min: float):
+        """Points the artists at the rows of `seg` and the return dots of `points`."""
+        x = mdates.date2num(seg.index)
+        zeros = np.zeros(len(seg))
+        vix = seg['VIX'].to_numpy(dtype=float)
+        drawdown = seg['Drawdown'].to_numpy(dtype=float) * 100
+
+        self.spx.set_data(x, seg['SPX'].to_numpy(dtype=float))
+        self.vix.set_verts(_fill_polygons(x, vix, np.full(len(seg), vix_min)))
+        self.drawdown_fill.set_verts(_fill_polygons(x, drawdown, zeros))
+        self.drawdown.set_data(x, drawdown)
+        self.slope.set_data(x, seg['Slope'].to_numpy(dtype=float))
+        recession = (seg['Recession'] == 1).to_numpy() if 'Recession' in seg.columns else zeros.astype(bool)
+        self.recession.set_verts(_fill_polygons(x, zeros + 1, zeros, where=recession))
+
+        offsets = np.column_stack([mdates.date2num(points.index), points['Log_Return'].to_numpy(dtype=float)])
+        for tier, dots in self.dots.items():
+            dots.set_offsets(offsets[tiers == tier])
@@ -1,5 +1,153 @@
+import json
+import math
+import sys
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Protocol, TextIO, Union
+
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+from market_monitor.analytics.math_lib import classify_mad_tiers
+
+
+@dataclass
+class ReportRecord:
+    """
+    The report of one ticker as a flat record.
+
+    Attributes:
+        ticker: The ticker symbol.
+        date: Date of the latest bar.
+        frequency: Bar frequency ('daily', 'weekly', ...).
+        level: Latest price.
+        log_return: Latest log return.
+        simple_return: Latest simple return.
+        drawdown: Latest drawdown (fraction, <= 0).
+        vix: Latest VIX.
+        slope: Latest 10Y-3M slope (percent).
+        lifetime_sigma: Lifetime standard deviation of log returns.
+        lifetime_mad: Lifetime mean absolute deviation of log returns.
+        sigma_move: Latest log return in lifetime sigmas.
+        mad_move: Latest log return in lifetime MADs.
+        tier: Signed MAD tier of the latest move (see `classify_mad_tiers`).
+    """
+    ticker: str
+    date: pd.Timestamp
+    frequency: str
+    level: float
+    log_return: float
+    simple_return: float
+    drawdown: float
+    vix: float
+    slope: float
+    lifetime_sigma: float
+    lifetime_mad: float
+    sigma_move: float
+    mad_move: float
+    tier: int
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        lifetime_sigma: float,
+        lifetime_mad: float,
+        ticker: str = "^GSPC",
+        frequency: str = 'daily',
+        price_column: str = 'SPX'
+    ) -> "ReportRecord":
+        """Builds the record from the last row of an analytics frame."""
+        last = df.iloc[-1]
+        log_return = float(last['Log_Return'])
+        tier = classify_mad_tiers(pd.Series([log_return]), lifetime_mad).iloc[0]
+        return cls(
+            ticker=ticker,
+            date=df.index[-1],
+            frequency=frequency,
+            level=float(last[price_column]),
+            log_return=log_return,
+            simple_return=float(np.exp(log_return) - 1),
+            drawdown=float(last['Drawdown']),
+            vix=float(last['VIX']) if 'VIX' in df.columns else np.nan,
+            slope=float(last['Slope']) if 'Slope' in df.columns else np.nan,
+            lifetime_sigma=float(lifetime_sigma),
+            lifetime_mad=float(lifetime_mad),
+            sigma_move=log_return / lifetime_sigma,
+            mad_move=log_return / lifetime_mad,
+            tier=int(tier),
+        )
+
+
+# Column layout of the Arrow IPC stream
+ARROW_SCHEMA = pa.schema([
+    ('ticker', pa.string()),
+    ('date', pa.date32()),
+    ('frequency', pa.string()),
+    ('level', pa.float64()),
+    ('log_return', pa.float64()),
+    ('simple_return', pa.float64()),
+    ('drawdown', pa.float64()),
+    ('vix', pa.float64()),
+    ('slope', pa.float64()),
+    ('lifetime_sigma', pa.float64()),
+    ('lifetime_mad', pa.float64()),
+    ('sigma_move', pa.float64()),
+    ('mad_move', pa.float64()),
+    ('tier', pa.int8()),
+])
+
+
+def format_record(record: ReportRecord) -> str:
+    """Formats one record as the operational briefing text."""
+    label = "S&P 500 Level:" if record.ticker == "^GSPC" else f"{record.ticker} Level:"
+    lines = [
+        "",
+        "="*60,
+        f"MARKET MONITOR REPORT: {record.date.strftime('%Y-%m-%d')}",
+        "="*60,
+        f"{label:<20}${record.level:,.2f}",
+        f"{record.frequency.title() + ' Return:':<20}{record.simple_return:.2%}",
+        f"Current Drawdown:   {record.drawdown*100:.2f}%",
+        f"VIX Index:          {record.vix:.2f}",
+        f"Yield Curve Slope:  {record.slope:.2f}%",
+        "-" * 60,
+        f"Lifetime Sigma (σ): {record.lifetime_sigma:.6f}",
+        f"Lifetime MAD:       {record.lifetime_mad:.6f}",
+        "-" * 60,
+        f"Move Severity (σ):  {record.sigma_move:+.2f} σ",
+        f"Move Severity (MAD):{record.mad_move:+.2f} MAD",
+        "="*60,
+    ]
+    return "\n".join(lines)
+
+
+def format_report(
+    df: pd.DataFrame,
+    current_sigma_move: float,
+    current_mad_move: float,
+    lifetime_sigma: float,
+    lifetime_mad: float,
+    frequency: str = 'daily'
+) -> str:
+    """
+    Formats the Market Monitor report.
+
+    Args:
+        df: The main dataframe containing 'SPX', 'VIX', 'Slope', 'Drawdown'.
+        current_sigma_move: The current move magnitude in sigma.
+        current_mad_move: The current move magnitude in MAD.
+        lifetime_sigma: The lifetime standard deviation.
+        lifetime_mad: The lifetime mean absolute deviation.
+        frequency: Bar frequency of `df` ('daily', 'weekly', ...).
+
+    Returns:
+        str: The report text.
+    """
+    record = ReportRecord.from_frame(df, lifetime_sigma, lifetime_mad, frequency=frequency)
+    record.sigma_move = current_sigma_move
+    record.mad_move = current_mad_move
+    return format_record(record)
 
 def print_report(
     df: pd.DataFrame,
@@ -18,21 +166,112 @@ def print_report(
         lifetime_sigma: The lifetime standard deviation.
         lifetime_mad: The lifetime mean absolute deviation.
     """
-    # Calculate daily return for display
-    current_log_ret = df['Log_Return'].iloc[-1]
-
-    print("\n" + "="*60)
-    print(f"MARKET MONITOR REPORT: {df.index[-1].strftime('%Y-%m-%d')}")
-    print("="*60)
-    print(f"S&P 500 Level:      ${df['SPX'].iloc[-1]:,.2f}")
-    print(f"Daily Return:       {np.exp(current_log_ret)-1:.2%}")
-    print(f"Current Drawdown:   {df['Drawdown'].iloc[-1]*100:.2f}%")
-    print(f"VIX Index:          {df['VIX'].iloc[-1]:.2f}")
-    print(f"Yield Curve Slope:  {df['Slope'].iloc[-1]:.2f}%")
-    print("-" * 60)
-    print(f"Lifetime Sigma (σ): {lifetime_sigma:.6f}")
-    print(f"Lifetime MAD:       {lifetime_mad:.6f}")
-    print("-" * 60)
-    print(f"Move Severity (σ):  {current_sigma_move:+.2f} σ")
-    print(f"Move Severity (MAD):{current_mad_move:+.2f} MAD")
-    print("="*60)
+    print(format_report(df, current_sigma_move, current_mad_move, lifetime_sigma, lifetime_mad))
+
+
+# ---------------------------------------------------------------------------
+# Reporters: one `emit` per ticker, flushed as it arrives
+# ---------------------------------------------------------------------------
+
+class Reporter(Protocol):
+    def emit(self, record: ReportRecord) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class _SinkReporter:
+    """Opens `sink` if it is a path (and then owns it); supports `with`."""
+    mode = "w"
+
+    def __init__(self, sink):
+        self._owns = isinstance(sink, str)
+        self.sink = open(sink, self.mode) if self._owns else sink
+
+    def close(self) -> None:
+        if self._owns:
+            self.sink.close()
+        else:
+            self.sink.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TextReporter(_SinkReporter):
+    """Writes the human-readable briefing (the classic console report)."""
+    def __init__(self, sink: Union[str, TextIO, None] = None):
+        super().__init__(sys.stdout if sink is None else sink)
+
+    def emit(self, record: ReportRecord) -> None:
+        self.sink.write(format_record(record) + "\n")
+        self.sink.flush()
+
+
+class JsonLinesReporter(_SinkReporter):
+    """Writes one JSON object per record (NaN becomes null, dates are ISO)."""
+    def __init__(self, sink: Union[str, TextIO, None] = None):
+        super().__init__(sys.stdout if sink is None else sink)
+
+    def emit(self, record: ReportRecord) -> None:
+        row = asdict(record)
+        row['date'] = record.date.strftime('%Y-%m-%d')
+        row = {k: (None if isinstance(v, float) and not math.isfinite(v) else v) for k, v in row.items()}
+        self.sink.write(json.dumps(row) + "\n")
+        self.sink.flush()
+
+
+class ArrowStreamReporter(_SinkReporter):
+    """
+    Writes records as an Arrow IPC stream with `ARROW_SCHEMA`.
+
+    Records are buffered into record batches of `batch_size` rows; each batch
+    is written and flushed as soon as it is full, so only one batch is ever
+    held in memory. Read back with `read_arrow_report`.
+
+    Args:
+        sink: Path or binary stream (default: stdout).
+        batch_size: Records per batch (1 = flush each ticker as it finishes).
+    """
+    mode = "wb"
+
+    def __init__(self, sink: Union[str, BinaryIO, None] = None, batch_size: int = 1):
+        super().__init__(sys.stdout.buffer if sink is None else sink)
+        self.batch_size = batch_size
+        self._rows = []
+        self._writer = pa.ipc.new_stream(self.sink, ARROW_SCHEMA)
+
+    def emit(self, record: ReportRecord) -> None:
+        row = asdict(record)
+        row['date'] = record.date.date()
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._writer.write_batch(pa.RecordBatch.from_pylist(self._rows, schema=ARROW_SCHEMA))
+            self._rows = []
+            self.sink.flush()
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+        super().close()
+
+
+REPORTERS = {
+    'text': TextReporter,
+    'jsonl': JsonLinesReporter,
+    'arrow': ArrowStreamReporter,
+}
+
+
+def read_arrow_report(path: str) -> pa.Table:
+    """Reads an Arrow report stream; columns are memory-mapped, not copied."""
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_stream(source).read_all()
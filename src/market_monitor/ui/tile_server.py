@@ -0,0 +1,303 @@
+"""
+Level-of-detail tile server for exploring long histories interactively.
+
+Every dashboard track is summarised into a pyramid of min/max/last buckets at
+daily, weekly, monthly and yearly granularity. A viewport request is answered
+from the finest level that fits the client's point budget, so zooming into
+1929 or 1987 never ships the full century. MAD outliers are always served at
+full resolution.
+
+The pyramid is persisted between runs (`save` / `load`), so each run only
+folds the rows of its delta sync into it.
+"""
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from market_monitor.analytics.math_lib import classify_mad_tiers
+
+logger = logging.getLogger(__name__)
+
+# Finest to coarsest; values are pandas period frequencies
+LEVELS = {
+    'daily': 'D',
+    'weekly': 'W-FRI',
+    'monthly': 'M',
+    'yearly': 'Y',
+}
+DEFAULT_TRACKS = ('SPX', 'VIX', 'Log_Return', 'Drawdown', 'Slope')
+DEFAULT_MAX_POINTS = 2000
+
+
+def _bucketize(series: pd.Series, freq: str) -> pd.DataFrame:
+    """Aggregates a series into min/max/last buckets keyed by bucket start."""
+    series = series.dropna()
+    buckets = series.groupby(series.index.to_period(freq)).agg(['min', 'max', 'last'])
+    buckets.index = buckets.index.start_time
+    return buckets
+
+
+class TilePyramid:
+    """
+    Multi-resolution min/max/last summaries of the dashboard tracks.
+
+    `build` summarises a full history; `update` re-aggregates only the buckets
+    at or after the first new row, so a delta sync touches the newest bucket
+    of each level rather than the whole pyramid. `save` and `load` keep it in
+    a directory between runs.
+    """
+    def __init__(self, tracks: Sequence[str] = DEFAULT_TRACKS, levels: Optional[Dict[str, str]] = None):
+        self.tracks = list(tracks)
+        self.levels = dict(levels or LEVELS)
+        self.pyramid: Dict[str, Dict[str, pd.DataFrame]] = {}
+        self.outliers = pd.DataFrame(columns=['value', 'tier'])
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self._lock = threading.Lock()
+
+    def build(self, df: pd.DataFrame, lifetime_mad: float) -> None:
+        """Builds every level of the pyramid from the full history."""
+        tracks = [t for t in self.tracks if t in df.columns]
+        pyramid = {
+            track: {level: _bucketize(df[track], freq) for level, freq in self.levels.items()}
+            for track in tracks
+        }
+        outliers = self._classify(df, lifetime_mad)
+        with self._lock:
+            self.pyramid = pyramid
+            self.outliers = outliers
+            self.last_timestamp = df.index[-1] if not df.empty else None
+
+    def update(self, df: pd.DataFrame, lifetime_mad: float) -> None:
+        """
+        Folds rows newer than the last build into the pyramid.
+
+        Args:
+            df: The full (delta-synced) dataframe.
+            lifetime_mad: The current lifetime MAD, for outlier classification.
+        """
+        if self.last_timestamp is None or not self.pyramid or self.last_timestamp not in df.index:
+            # Nothing to extend, or the history was rewritten below the last build
+            self.build(df, lifetime_mad)
+            return
+
+        new_rows = df.index[df.index > self.last_timestamp]
+        if new_rows.empty:
+            logger.debug("Tile pyramid is up to date.")
+            return
+        first_new = new_rows[0]
+
+        pyramid = {}
+        for track, levels in self.pyramid.items():
+            pyramid[track] = {}
+            for level, buckets in levels.items():
+                freq = self.levels[level]
+                bucket_start = first_new.to_period(freq).start_time
+                # The open bucket and anything after it are re-aggregated
+                tail = _bucketize(df[track][df.index >= bucket_start], freq)
+                pyramid[track][level] = pd.concat([buckets[buckets.index < bucket_start], tail])
+
+        outliers = self._classify(df, lifetime_mad)
+        with self._lock:
+            self.pyramid = pyramid
+            self.outliers = outliers
+            self.last_timestamp = df.index[-1]
+        logger.debug(f"Tile pyramid updated from {first_new.strftime('%Y-%m-%d')}.")
+
+    def save(self, directory: str) -> None:
+        """Writes the pyramid to `directory` (one Parquet file per track and level)."""
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._lock:
+            pyramid, outliers, last_timestamp = self.pyramid, self.outliers, self.last_timestamp
+        for track, levels in pyramid.items():
+            for level, buckets in levels.items():
+                buckets.to_parquet(os.path.join(directory, f"{track}@{level}.parquet"))
+        outliers.to_parquet(os.path.join(directory, "outliers.parquet"))
+        # The manifest is written last, so a partial save is never loaded
+        manifest = {
+            'tracks': list(pyramid),
+            'levels': self.levels,
+            'last_timestamp': last_timestamp.isoformat() if last_timestamp is not None else None,
+        }
+        tmp = os.path.join(directory, "pyramid.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, os.path.join(directory, "pyramid.json"))
+
+    @classmethod
+    def load(cls, directory: str, tracks: Sequence[str] = DEFAULT_TRACKS) -> "TilePyramid":
+        """Reads a pyramid written by `save`; an empty pyramid if there is none (or it does not match)."""
+        try:
+            with open(os.path.join(directory, "pyramid.json")) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(tracks)
+
+        pyramid = cls(tracks, manifest['levels'])
+        if manifest['last_timestamp'] is None or not set(manifest['tracks']) <= set(pyramid.tracks):
+            return pyramid
+        try:
+            pyramid.pyramid = {
+                track: {
+                    level: pd.read_parquet(os.path.join(directory, f"{track}@{level}.parquet"))
+                    for level in pyramid.levels
+                }
+                for track in manifest['tracks']
+            }
+            pyramid.outliers = pd.read_parquet(os.path.join(directory, "outliers.parquet"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Tile pyramid in {directory} is unreadable, rebuilding: {e}")
+            return cls(tracks, manifest['levels'])
+        pyramid.last_timestamp = pd.Timestamp(manifest['last_timestamp'])
+        return pyramid
+
+    @staticmethod
+    def _classify(df: pd.DataFrame, lifetime_mad: float) -> pd.DataFrame:
+        if 'Log_Return' not in df.columns:
+            return pd.DataFrame(columns=['value', 'tier'])
+        tier = classify_mad_tiers(df['Log_Return'], lifetime_mad)
+        mask = tier != 0
+        return pd.DataFrame({'value': df['Log_Return'][mask], 'tier': tier[mask]})
+
+    def extent(self) -> Dict[str, Dict[str, str]]:
+        """Returns the first and last bucket of each track at daily resolution."""
+        with self._lock:
+            finest = next(iter(self.levels))
+            return {
+                track: {
+                    'start': levels[finest].index[0].isoformat(),
+                    'end': levels[finest].index[-1].isoformat(),
+                }
+                for track, levels in self.pyramid.items()
+                if not levels[finest].empty
+            }
+
+    def query(
+        self,
+        track: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        max_points: int = DEFAULT_MAX_POINTS
+    ) -> dict:
+        """
+        Returns the buckets of `track` overlapping [start, end].
+
+        The finest level with at most `max_points` buckets in the viewport is
+        chosen (the coarsest level is used if none fits). Outliers inside the
+        viewport are attached at full resolution for the `Log_Return` track.
+
+        Raises:
+            KeyError: If the track is not in the pyramid.
+        """
+        with self._lock:
+            levels = self.pyramid[track]
+            outliers = self.outliers
+
+        chosen = None
+        for level in self.levels:
+            buckets = levels[level]
+            # Include the bucket the viewport starts in
+            lo = max(buckets.index.searchsorted(start, side='right') - 1, 0) if start is not None else 0
+            hi = buckets.index.searchsorted(end, side='right') if end is not None else len(buckets)
+            chosen = (level, buckets.iloc[lo:hi])
+            if hi - lo <= max_points:
+                break
+
+        level, visible = chosen
+        payload = {
+            'track': track,
+            'level': level,
+            't': [ts.isoformat() for ts in visible.index],
+            'min': visible['min'].tolist(),
+            'max': visible['max'].tolist(),
+            'last': visible['last'].tolist(),
+        }
+        if track == 'Log_Return':
+            window = outliers
+            if start is not None:
+                window = window[window.index >= start]
+            if end is not None:
+                window = window[window.index <= end]
+            payload['outliers'] = {
+                't': [ts.isoformat() for ts in window.index],
+                'value': window['value'].tolist(),
+                'tier': [int(t) for t in window['tier']],
+            }
+        return payload
+
+
+class _TileRequestHandler(BaseHTTPRequestHandler):
+    pyramid: TilePyramid
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path == '/tracks':
+            self._send_json(200, self.pyramid.extent())
+            return
+        if url.path != '/tiles':
+            self._send_json(404, {'error': f"Unknown path {url.path}"})
+            return
+
+        try:
+            track = params['track']
+            start = pd.Timestamp(params['start']) if 'start' in params else None
+            end = pd.Timestamp(params['end']) if 'end' in params else None
+            max_points = int(params.get('max_points', DEFAULT_MAX_POINTS))
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {'error': f"Bad request: {e}"})
+            return
+
+        try:
+            payload = self.pyramid.query(track, start, end, max_points)
+        except KeyError:
+            self._send_json(404, {'error': f"Unknown track {track}"})
+            return
+        self._send_json(200, payload)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class TileServer:
+    """
+    Local HTTP service for a `TilePyramid`.
+
+    Endpoints:
+        GET /tracks                                   -> extent of each track
+        GET /tiles?track=SPX&start=1929-01-01&end=1930-12-31&max_points=500
+    """
+    def __init__(self, pyramid: TilePyramid, host: str = '127.0.0.1', port: int = 8765):
+        handler = type('TileRequestHandler', (_TileRequestHandler,), {'pyramid': pyramid})
+        self.pyramid = pyramid
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        logger.info(f"[*] Serving dashboard tiles on {self.address}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def shutdown(self):
+        self.httpd.shutdown()
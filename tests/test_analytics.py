@@ -1,7 +1,17 @@
 import numpy as np
 import pandas as pd
 import pytest
-from market_monitor.analytics.math_lib import get_log_returns, calculate_drawdown
+from market_monitor.analytics.math_lib import get_log_returns, calculate_drawdown, classify_mad_tiers
+from market_monitor.analytics.streaming import stream_lifetime_stats
+from market_monitor.analytics.tail import hill_alphas, hill_plot
+from market_monitor.analytics.correlation import rolling_correlation_blocks, rolling_pairwise_moments
+from market_monitor.analytics.robust_scale import (
+    ewma_mean_abs_deviation,
+    rolling_mean_abs_deviation,
+    rolling_median,
+    rolling_median_abs_deviation,
+    rolling_robust_scales,
+)
 
 def test_get_log_returns():
     prices = pd.Series([100, 105, 102, 110])
@@ -25,3 +35,166 @@ def test_calculate_drawdown():
     assert dd.iloc[3] == 0.0
     # 117 -> HWM 130 -> DD (117/130 - 1) = -0.1
     assert np.isclose(dd.iloc[4], -0.1)
+
+def _brute_force_rolling(values: pd.Series, window: int, func) -> pd.Series:
+    return values.rolling(window).apply(func, raw=True)
+
+def test_rolling_robust_scales_match_brute_force():
+    rng = np.random.default_rng(42)
+    returns = pd.Series(rng.standard_t(3, size=400) * 0.01)
+    returns.iloc[150:160] = 0.002 # Ties
+
+    windows = [5, 20, 63]
+    mean_ad = rolling_mean_abs_deviation(returns, windows)
+    median = rolling_median(returns, windows)
+    median_ad = rolling_median_abs_deviation(returns, windows)
+
+    for w in windows:
+        expected_mean_ad = _brute_force_rolling(returns, w, lambda a: np.mean(np.abs(a - a.mean())))
+        expected_median_ad = _brute_force_rolling(returns, w, lambda a: np.median(np.abs(a - np.median(a))))
+
+        pd.testing.assert_series_equal(mean_ad[w], expected_mean_ad, check_names=False)
+        pd.testing.assert_series_equal(median[w], returns.rolling(w).median(), check_names=False)
+        pd.testing.assert_series_equal(median_ad[w], expected_median_ad, check_names=False)
+
+def test_rolling_scales_skip_nan_and_support_panels():
+    panel = pd.DataFrame({
+        'A': [0.01, np.nan, -0.02, 0.03, 0.00, -0.01],
+        'B': [0.02, 0.01, 0.00, -0.01, -0.02, 0.05],
+    })
+    result = rolling_median_abs_deviation(panel, [3], min_periods=2)
+
+    assert list(result.columns) == [('A', 3), ('B', 3)]
+    # Window [0.01, NaN, -0.02] -> median -0.005, deviations 0.015, 0.015
+    assert np.isclose(result[('A', 3)].iloc[2], 0.015)
+    # Only one valid observation in the first window
+    assert np.isnan(result[('A', 3)].iloc[1])
+
+def test_rolling_robust_scales_one_pass_matches_single_statistics():
+    rng = np.random.default_rng(3)
+    panel = pd.DataFrame(rng.standard_t(4, size=(700, 3)) * 0.01, columns=['SPX', 'VIX', 'Slope'])
+    panel.iloc[100:140, 1] = np.nan
+    windows = [4, 30, 200]
+
+    result = rolling_robust_scales(panel, windows, min_periods=3)
+    assert set(result) == {'mean_ad', 'median', 'median_ad'}
+    pd.testing.assert_frame_equal(result['median'], rolling_median(panel, windows, min_periods=3))
+    pd.testing.assert_frame_equal(result['median_ad'], rolling_median_abs_deviation(panel, windows, min_periods=3))
+    pd.testing.assert_frame_equal(result['mean_ad'], rolling_mean_abs_deviation(panel, windows, min_periods=3))
+
+    for w in windows:
+        expected = panel['VIX'].rolling(w, min_periods=3).apply(lambda a: np.nanmedian(np.abs(a - np.nanmedian(a))), raw=True)
+        pd.testing.assert_series_equal(result['median_ad'][('VIX', w)], expected, check_names=False)
+        pd.testing.assert_series_equal(result['median'][('VIX', w)], panel['VIX'].rolling(w, min_periods=3).median(),
+                                       check_names=False)
+
+def test_rolling_scales_survive_inf_and_large_levels():
+    rng = np.random.default_rng(11)
+    returns = pd.Series(rng.standard_t(3, size=1500) * 0.01)
+    returns.iloc[:300] += 1e6 # A level far above the later returns
+    returns.iloc[700] = -np.inf # Log return off a zero price
+    windows = [21, 252]
+
+    result = rolling_robust_scales(returns, windows, min_periods=10)
+    pd.testing.assert_frame_equal(result['mean_ad'], rolling_mean_abs_deviation(returns, windows, min_periods=10))
+
+    # Like pandas, inf only drops out of the windows that hold it
+    finite = returns.replace(-np.inf, np.nan)
+    for w in windows:
+        rolling = finite.rolling(w, min_periods=10)
+        expected_mean_ad = rolling.apply(lambda a: np.nanmean(np.abs(a - np.nanmean(a))), raw=True)
+        expected_median_ad = rolling.apply(lambda a: np.nanmedian(np.abs(a - np.nanmedian(a))), raw=True)
+        pd.testing.assert_series_equal(result['mean_ad'][w].iloc[300 + w:], expected_mean_ad.iloc[300 + w:],
+                                       check_names=False, rtol=1e-9)
+        pd.testing.assert_series_equal(result['median'][w], rolling.median(), check_names=False)
+        pd.testing.assert_series_equal(result['median_ad'][w], expected_median_ad, check_names=False)
+
+def test_ewma_mean_abs_deviation_uses_prior_mean():
+    returns = pd.Series([0.0, 0.0, 0.0, 0.1])
+    result = ewma_mean_abs_deviation(returns, [1])
+
+    # No deviation until the jump, which is scored against the prior mean (0)
+    assert result[1].iloc[2] == 0.0
+    assert result[1].iloc[3] > 0.0
+
+def test_rolling_pairwise_moments_match_pandas():
+    rng = np.random.default_rng(7)
+    panel = pd.DataFrame(rng.normal(0, 0.01, size=(300, 3)), columns=['SPX', 'VIX', 'Slope'])
+    panel.iloc[5:15, 1] = np.nan # Pairwise-complete handling
+
+    result = rolling_pairwise_moments(panel, panel, window=40, min_periods=20, chunk_rows=64, symmetric=True)
+
+    expected_cov = panel['SPX'].rolling(40, min_periods=20).cov(panel['VIX'])
+    expected_corr = panel['SPX'].rolling(40, min_periods=20).corr(panel['VIX'])
+    pd.testing.assert_series_equal(result[('cov', 'SPX', 'VIX')], expected_cov, check_names=False)
+    pd.testing.assert_series_equal(result[('corr', 'SPX', 'VIX')], expected_corr, check_names=False)
+    # Only pairs above the diagonal for a symmetric block
+    assert ('corr', 'SPX', 'SPX') not in result.columns
+    assert len(result.columns) == 6
+
+def test_rolling_correlation_blocks_cover_all_pairs():
+    rng = np.random.default_rng(3)
+    panel = pd.DataFrame(rng.normal(size=(50, 5)), columns=list('ABCDE'))
+
+    pairs = set()
+    for key, block in rolling_correlation_blocks(panel, window=10, block_size=2):
+        pairs.update((a, b) for stat, a, b in block.columns if stat == 'corr')
+
+    assert len(pairs) == 10 # 5 choose 2
+
+def test_streaming_matches_in_memory_path():
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range('1990-01-01', periods=500)
+    prices = pd.Series(100 * np.exp(rng.standard_t(3, size=500).cumsum() * 0.01), index=dates)
+    prices.iloc[250] = np.nan # Missing print mid-stream
+
+    # In-memory reference (same formulas as core.app)
+    df = pd.DataFrame({'SPX': prices})
+    df['Log_Return'] = get_log_returns(df['SPX'])
+    df['Drawdown'] = calculate_drawdown(df['SPX'])
+    df = df.dropna(subset=['Log_Return'])
+    lifetime_sigma = df['Log_Return'].std()
+    lifetime_mad = (df['Log_Return'] - df['Log_Return'].mean()).abs().mean()
+
+    def source():
+        return (prices.iloc[i:i + 37] for i in range(0, len(prices), 37))
+
+    streamed = []
+    summary = stream_lifetime_stats(source, sink=streamed.append)
+    streamed = pd.concat(streamed)
+
+    np.testing.assert_array_equal(streamed['Log_Return'].to_numpy(), df['Log_Return'].to_numpy())
+    np.testing.assert_array_equal(streamed['Drawdown'].to_numpy(), df['Drawdown'].to_numpy())
+    assert np.isclose(summary.lifetime_sigma, lifetime_sigma, rtol=1e-13, atol=0)
+    assert np.isclose(summary.lifetime_mad, lifetime_mad, rtol=1e-13, atol=0)
+    assert summary.last.name == df.index[-1]
+
+    tier = classify_mad_tiers(df['Log_Return'], lifetime_mad)
+    assert list(summary.outliers.index) == list(tier[tier != 0].index)
+
+def test_hill_alphas_match_naive_estimator():
+    rng = np.random.default_rng(9)
+    losses = rng.pareto(3.0, size=500) + 1.0
+
+    alphas = hill_alphas(losses)
+
+    desc = np.sort(losses)[::-1]
+    for k in [1, 10, 50, 250]:
+        naive = 1.0 / (np.mean(np.log(desc[:k])) - np.log(desc[k]))
+        assert np.isclose(alphas[k - 1], naive)
+
+def test_hill_plot_recovers_pareto_tail():
+    rng = np.random.default_rng(21)
+    returns = pd.Series(-(rng.pareto(3.0, size=5000) + 1.0) * 0.01)
+
+    plot = hill_plot(returns, n_boot=50, batch_size=10, n_jobs=2, seed=0)
+    inline = hill_plot(returns, n_boot=50, batch_size=10, n_jobs=1, seed=0)
+
+    assert abs(plot.stable_alpha - 3.0) < 0.3
+    lo, hi = plot.stable_k
+    assert 10 <= lo < hi <= 500
+    # Bands bracket the estimate and do not depend on the worker count
+    mid = slice(lo - 1, hi)
+    assert np.all(plot.lower[mid] <= plot.alpha[mid]) and np.all(plot.alpha[mid] <= plot.upper[mid])
+    np.testing.assert_array_equal(plot.lower, inline.lower)
+    assert list(plot.to_frame().columns) == ['alpha', 'lower', 'upper']
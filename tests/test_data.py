@@ -1,10 +1,23 @@
+import numpy as np
 import pandas as pd
 import pytest
 from unittest.mock import MagicMock, patch
 from market_monitor.data.adapters import YahooFinanceAdapter, CSVAdapter
 from market_monitor.data.store import ParquetStore
+from market_monitor.data.manager import fetch_and_update
+from market_monitor.core.correlations import update_rolling_correlations
+from market_monitor.data.calendars import XNYS
+from market_monitor.data.freshness import FreshnessPlanner, FRED_DAILY, FRED_MONTHLY, YAHOO_US_DAILY
+from market_monitor.analytics.correlation import rolling_pairwise_moments
+from market_monitor.analytics.math_lib import get_log_returns, calculate_drawdown
+from market_monitor.data.resample import ResampleCache, resample_prices
+from market_monitor.data.validation import DeltaValidator, QualityRules
+from market_monitor.data.transport import ConditionalCache, TokenBucket, Transport, RetryPolicy, parse_retry_after
 import os
 import shutil
+import requests
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # --- Test ParquetStore ---
 @pytest.fixture
@@ -31,6 +44,27 @@ def test_store_save_load(clean_cache):
     assert loaded_df is not None
     pd.testing.assert_frame_equal(df, loaded_df)
 
+def test_store_append_adds_parts(clean_cache, monkeypatch):
+    monkeypatch.setattr('market_monitor.data.store.MAX_PARTS', 3)
+    store = ParquetStore(cache_dir=clean_cache)
+    dates = pd.bdate_range('2020-01-01', periods=6)
+    df = pd.DataFrame({'A': np.arange(6.0)}, index=dates)
+
+    store.save(df.iloc[:2], 'TEST')
+    for i in range(2, 6):
+        store.append(df.iloc[i:i + 1], 'TEST')
+    # Parts merged once three accumulated, then one more appended
+    assert len(store._get_parts('TEST')) == 2
+    pd.testing.assert_frame_equal(store.load('TEST'), df, check_freq=False)
+    assert store.get_last_date('TEST') == dates[-1]
+    assert list(store.get_columns('TEST')) == ['A']
+    assert pd.concat(store.iter_batches('TEST', batch_size=2))['A'].tolist() == list(np.arange(6.0))
+
+    # A full save supersedes the parts
+    store.save(df.iloc[:3], 'TEST')
+    assert store._get_parts('TEST') == []
+    assert len(store.load('TEST')) == 3
+
 def test_store_miss(clean_cache):
     store = ParquetStore(cache_dir=clean_cache)
     loaded_df = store.load('MISSING')
@@ -51,26 +85,445 @@ def test_csv_adapter(tmp_path):
     assert 'SPX' in result.columns
     assert len(result) == 2
 
-@patch('yfinance.download')
-def test_yahoo_adapter_no_cache(mock_download):
-    # Mock return data
-    # Standard Yahoo Finance structure (MultiIndex columns)
-    arrays = [['Close', 'Close'], ['SPX', 'VIX']]
-    tuples = list(zip(*arrays))
-    index = pd.MultiIndex.from_tuples(tuples, names=['Price', 'Ticker'])
-
-    mock_data = pd.DataFrame(
-        [[100, 20], [101, 19]],
-        index=pd.to_datetime(['2023-01-01', '2023-01-02']),
-        columns=index
-    )
+def _history(closes):
+    index = pd.date_range('2023-01-03', periods=len(closes), freq='B', tz='America/New_York', name='Date')
+    return pd.DataFrame({'Open': closes, 'Close': closes}, index=index)
 
-    mock_download.return_value = mock_data
+@patch('yfinance.Ticker')
+def test_yahoo_adapter_no_cache(mock_ticker):
+    mock_ticker.return_value.history.side_effect = [_history([100.0, 101.0]), _history([20.0, 19.0])]
 
-    adapter = YahooFinanceAdapter(use_cache=False)
+    transport = Transport()
+    adapter = YahooFinanceAdapter(use_cache=False, transport=transport)
     result = adapter.get_data(['SPX', 'VIX'], '2023-01-01')
 
     assert not result.empty
     assert 'SPX' in result.columns
     assert 'VIX' in result.columns
-    mock_download.assert_called_once()
+    assert result.index.tz is None
+    # One shared session for every ticker
+    sessions = {c.kwargs['session'] for c in mock_ticker.call_args_list}
+    assert sessions == {transport.browser_session()}
+    transport.close()
+
+@patch('yfinance.Ticker')
+def test_yahoo_adapter_retries_transient_errors(mock_ticker):
+    from curl_cffi.requests.exceptions import DNSError
+    from yfinance.exceptions import YFPricesMissingError, YFRateLimitError
+    history = mock_ticker.return_value.history
+    history.side_effect = [DNSError("Could not resolve host"), YFRateLimitError(), _history([100.0, 101.0])]
+
+    sleeps = []
+    transport = Transport(default_rate_limit=(1000.0, 10.0), rate_limits={}, sleep=sleeps.append)
+    result = YahooFinanceAdapter(use_cache=False, transport=transport).get_data(['^GSPC'], '2023-01-01')
+    assert history.call_count == 3 and len(sleeps) == 2
+    assert result['^GSPC'].tolist() == [100.0, 101.0]
+
+    # No prices in range: final, not retried
+    history.reset_mock()
+    history.side_effect = YFPricesMissingError('^GSPC', '')
+    assert YahooFinanceAdapter(use_cache=False, transport=transport).get_data(['^GSPC'], '2023-01-01').empty
+    assert history.call_count == 1
+    transport.close()
+
+def test_yahoo_adapter_leaves_yfinance_config_alone():
+    import yfinance as yf
+    before = yf.config.debug.hide_exceptions
+    YahooFinanceAdapter(use_cache=False, transport=Transport())
+    assert yf.config.debug.hide_exceptions == before
+
+# --- Test Rolling Correlation Storage ---
+
+def test_update_rolling_correlations_extends_stored_blocks(clean_cache):
+    store = ParquetStore(cache_dir=clean_cache)
+    dates = pd.date_range('2020-01-01', periods=120, freq='B')
+    rng = np.random.default_rng(11)
+    panel = pd.DataFrame(rng.normal(size=(120, 3)), index=dates, columns=['A', 'B', 'C'])
+
+    keys = update_rolling_correlations(panel.iloc[:100], 20, store, block_size=2)
+    assert len(keys) == 2 # Blocks (0,0) and (0,1); (1,1) holds no pair
+
+    # Nothing new -> nothing written
+    assert update_rolling_correlations(panel.iloc[:100], 20, store, block_size=2) == []
+
+    base_mtimes = {key: os.path.getmtime(store._get_filepath(key)) for key in keys}
+    update_rolling_correlations(panel.iloc[:110], 20, store, block_size=2)
+    update_rolling_correlations(panel, 20, store, block_size=2)
+    for key in keys:
+        # Extensions are appended as parts; the stored block is not rewritten
+        assert os.path.getmtime(store._get_filepath(key)) == base_mtimes[key]
+        assert len(store._get_parts(key)) == 2
+        assert store.get_last_date(key) == dates[-1]
+        extended = store.load(key)
+        left = [c for c in extended.columns.get_level_values('left').unique()]
+        right = [c for c in extended.columns.get_level_values('right').unique()]
+        full = rolling_pairwise_moments(panel[left], panel[right], 20, symmetric=(left == right))
+        assert len(extended) == 120
+        pd.testing.assert_frame_equal(extended, full, check_freq=False, check_names=False)
+
+# --- Test Calendars & Freshness Planning ---
+
+def test_nyse_calendar_holidays():
+    assert not XNYS.is_session('2024-03-29') # Good Friday
+    assert not XNYS.is_session('2026-07-03') # July 4th on Saturday, observed Friday
+    assert XNYS.is_session('2021-12-31') # New Year's Day on Saturday is not observed
+    assert not XNYS.is_session('2025-01-09') # National day of mourning
+    assert XNYS.next_session('2025-07-03') == pd.Timestamp('2025-07-07')
+    assert len(XNYS.sessions('2024-01-01', '2024-12-31')) == 252
+
+def _et(ts):
+    return pd.Timestamp(ts, tz='America/New_York')
+
+def test_planner_daily_schedule():
+    planner = FreshnessPlanner({'^GSPC': YAHOO_US_DAILY, 'T10Y3M': FRED_DAILY})
+    friday = pd.Timestamp('2026-10-16')
+
+    # Weekend: Friday's bar is the newest that can exist
+    assert not planner.plan('^GSPC', friday, now=_et('2026-10-18 12:00')).should_fetch
+    # Monday before the close has published
+    assert not planner.plan('^GSPC', friday, now=_et('2026-10-19 15:00')).should_fetch
+    # Monday evening
+    decision = planner.plan('^GSPC', friday, now=_et('2026-10-19 17:00'))
+    assert decision.should_fetch
+    assert decision.expected_latest == pd.Timestamp('2026-10-19')
+
+    # FRED publishes Friday's rate on Monday afternoon
+    thursday = pd.Timestamp('2026-10-15')
+    assert planner.plan('T10Y3M', thursday, now=_et('2026-10-19 09:00')).expected_latest == thursday
+    assert planner.plan('T10Y3M', thursday, now=_et('2026-10-19 17:00')).should_fetch
+
+def test_planner_monthly_schedule():
+    planner = FreshnessPlanner({'USREC': FRED_MONTHLY})
+    august = pd.Timestamp('2026-08-01')
+
+    assert not planner.plan('USREC', august, now=_et('2026-10-03 12:00')).should_fetch
+    assert planner.plan('USREC', august, now=_et('2026-10-10 12:00')).should_fetch
+    # Unknown tickers and empty stores are always fetched
+    assert planner.plan('OTHER', august).should_fetch
+    assert planner.plan('USREC', None).should_fetch
+
+def test_fetch_and_update_skips_when_planner_says_fresh(clean_cache):
+    store = ParquetStore(cache_dir=clean_cache)
+    existing = pd.DataFrame({'^GSPC': [100.0]}, index=pd.to_datetime(['2020-01-03']))
+    store.save(existing, '^GSPC')
+
+    adapter = MagicMock()
+    planner = MagicMock()
+    planner.plan.return_value.should_fetch = False
+
+    result = fetch_and_update('^GSPC', adapter, store, '1927-12-30', planner)
+
+    adapter.get_data.assert_not_called()
+    pd.testing.assert_frame_equal(result, existing)
+
+def test_store_iter_batches(clean_cache):
+    store = ParquetStore(cache_dir=clean_cache)
+    df = pd.DataFrame(
+        {'^GSPC': np.arange(10.0), 'Volume': np.arange(10)},
+        index=pd.bdate_range('2020-01-01', periods=10)
+    )
+    store.save(df, '^GSPC')
+
+    batches = list(store.iter_batches('^GSPC', batch_size=4, columns=['^GSPC']))
+
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert list(batches[0].columns) == ['^GSPC']
+    pd.testing.assert_frame_equal(pd.concat(batches), df[['^GSPC']], check_freq=False)
+    assert list(store.iter_batches('MISSING')) == []
+
+
+# --- Test Resample Cache ---
+
+def test_resample_cache_delta_matches_full_rebuild(clean_cache):
+    dates = pd.bdate_range('2019-01-01', '2021-03-10')
+    rng = np.random.default_rng(5)
+    prices = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))), index=dates)
+
+    cache = ResampleCache(ParquetStore(cache_dir=clean_cache))
+    cache.update('^GSPC', prices.iloc[:-30])
+    for stop in (len(prices) - 12, len(prices) - 3, len(prices)):
+        cache.update('^GSPC', prices.iloc[:stop])
+
+    for name, freq in cache.frequencies.items():
+        incremental = cache.load('^GSPC', name)
+        full = resample_prices(prices, freq)
+        pd.testing.assert_frame_equal(incremental, full, check_freq=False)
+        # Same definitions as the daily analytics, applied to the bar closes
+        np.testing.assert_allclose(incremental['Log_Return'], get_log_returns(full['Close']))
+        np.testing.assert_allclose(incremental['Drawdown'], calculate_drawdown(full['Close']))
+        stats = cache.stats('^GSPC', name)
+        assert stats['lifetime_sigma'] == pytest.approx(full['Log_Return'].std(), rel=1e-12)
+        mad = (full['Log_Return'] - full['Log_Return'].mean()).abs().mean()
+        assert stats['lifetime_mad'] == pytest.approx(mad, rel=1e-2) # Around the mean of the first build
+
+
+def test_resample_cache_stats_survive_reload(clean_cache):
+    dates = pd.bdate_range('2018-01-01', '2020-06-30')
+    rng = np.random.default_rng(8)
+    prices = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))), index=dates)
+    ResampleCache(ParquetStore(cache_dir=clean_cache), {'weekly': 'W-FRI'}).update('X', prices)
+
+    # The stats do not depend on DataFrame.attrs surviving the Parquet round trip
+    cache = ResampleCache(ParquetStore(cache_dir=clean_cache), {'weekly': 'W-FRI'})
+    returns = cache.load('X', 'weekly')['Log_Return']
+    stats = cache.stats('X', 'weekly')
+    assert stats['lifetime_sigma'] == pytest.approx(returns.std(), rel=1e-12)
+    assert stats['lifetime_mad'] == pytest.approx((returns - returns.mean()).abs().mean(), rel=1e-12)
+
+
+def test_resample_cache_recomputes_only_open_bucket(clean_cache):
+    dates = pd.bdate_range('2020-01-01', '2020-12-31')
+    prices = pd.Series(np.linspace(100, 150, len(dates)), index=dates)
+    cache = ResampleCache(ParquetStore(cache_dir=clean_cache), {'monthly': 'M'})
+    cache.update('X', prices.iloc[:-5])
+
+    with patch('market_monitor.data.resample.resample_prices', wraps=resample_prices) as spy, \
+         patch.object(ParquetStore, 'load') as load, patch.object(ParquetStore, 'save') as save:
+        bars = cache.update('X', prices)['monthly']
+    resampled = spy.call_args.args[0]
+    assert resampled.index[0] == pd.Timestamp('2020-12-01') # Open bucket only
+    # Closed bars are neither read back nor rewritten
+    load.assert_not_called()
+    save.assert_not_called()
+    assert bars.index[-1] == dates[-1]
+    assert len(bars) == 1
+    assert len(cache.load('X', 'monthly')) == 12
+
+    # Nothing new -> nothing recomputed
+    with patch('market_monitor.data.resample.resample_prices') as spy:
+        cache.update('X', prices)
+    spy.assert_not_called()
+
+
+# --- Test Delta Validation ---
+
+def _stored_history(n=400):
+    dates = XNYS.sessions('2023-01-03', '2025-01-01')[:n]
+    rng = np.random.default_rng(9)
+    return pd.DataFrame({'^GSPC': 4000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))}, index=dates)
+
+
+def test_delta_validator_quarantines_bad_rows(clean_cache):
+    store = ParquetStore(cache_dir=clean_cache)
+    existing = _stored_history()
+    last_date, last_price = existing.index[-1], existing['^GSPC'].iloc[-1]
+    sessions = XNYS.sessions(last_date + pd.Timedelta(days=1), last_date + pd.Timedelta(days=20))
+    delta = pd.DataFrame(
+        {'^GSPC': [last_price, last_price * 1.01, -5.0, np.nan, last_price * 5, last_price * 1.02, last_price * 1.0]},
+        index=pd.DatetimeIndex([last_date, sessions[0], sessions[1], sessions[2], sessions[3], sessions[5], sessions[4]]),
+    )
+
+    validator = DeltaValidator(store, {'^GSPC': QualityRules(calendar=XNYS)})
+    accepted, report = validator.validate('^GSPC', delta, existing)
+
+    # The spike is rejected; the following row (back at a normal level) is kept
+    assert list(accepted.index) == [sessions[0], sessions[5]]
+    assert report.issues == {
+        'stale_date': 1, 'non_positive': 1, 'missing': 1, 'jump': 1, 'out_of_order': 1, 'missing_session': 4,
+    }
+    # Sessions whose rows were rejected count as gaps
+    assert report.missing_sessions == [d.strftime('%Y-%m-%d') for d in sessions[1:5]]
+    assert report.rows_quarantined == 5
+
+    quarantine = store.load(DeltaValidator.quarantine_key('^GSPC'))
+    assert sorted(quarantine['Reason']) == sorted(['stale_date', 'non_positive', 'missing', 'jump', 'out_of_order'])
+    state = validator.load_state('^GSPC')
+    assert state['last']['rows_accepted'] == 2
+    assert state['stats']['count'] == len(existing) - 1 + 2
+
+
+def test_quarantine_keeps_every_entry(clean_cache):
+    store = ParquetStore(cache_dir=clean_cache)
+    existing = _stored_history()
+    last_date, last_price = existing.index[-1], existing['^GSPC'].iloc[-1]
+    next_session = XNYS.next_session(last_date)
+    validator = DeltaValidator(store, {'^GSPC': QualityRules(calendar=XNYS)})
+
+    # A duplicate-date pair whose rows are both rejected, then the same stale row on two runs
+    pair = pd.DataFrame({'^GSPC': [last_price, -1.0]}, index=pd.DatetimeIndex([next_session, next_session]))
+    validator.validate('^GSPC', pair, existing)
+    stale = pd.DataFrame({'^GSPC': [last_price]}, index=pd.DatetimeIndex([last_date]))
+    validator.validate('^GSPC', stale, existing)
+    validator.validate('^GSPC', stale, existing)
+
+    quarantine = store.load(DeltaValidator.quarantine_key('^GSPC'))
+    assert list(quarantine.loc[[next_session], 'Reason']) == ['duplicate_date', 'non_positive']
+    assert list(quarantine.loc[[last_date], 'Reason']) == ['stale_date', 'stale_date']
+    assert len(quarantine) == 4
+
+def test_sustained_level_shift_is_accepted(clean_cache):
+    store = ParquetStore(cache_dir=clean_cache)
+    existing = _stored_history()
+    store.save(existing, '^GSPC')
+    sessions = XNYS.sessions(existing.index[-1] + pd.Timedelta(days=1), existing.index[-1] + pd.Timedelta(days=30))[:6]
+    # The series moves to three times its level and stays there (e.g. a rebased index)
+    feed = pd.DataFrame({'^GSPC': existing['^GSPC'].iloc[-1] * 3 * np.array([1.0, 1.002, 0.999, 1.001, 1.003, 0.998])},
+                        index=sessions)
+
+    # One sync per session; each delta starts after the stored tail, so rejected rows are fetched again
+    adapter = MagicMock()
+    validator = DeltaValidator(store, {'^GSPC': QualityRules(calendar=XNYS)})
+    for day in range(1, 7):
+        adapter.get_data.side_effect = lambda tickers, start_date: feed.iloc[:day][feed.index[:day] >= start_date]
+        result = fetch_and_update('^GSPC', adapter, store, '2000-01-01', validator=validator)
+        report = validator.load_state('^GSPC')['last']
+        if day < 3:
+            assert len(result) == len(existing)
+            assert report['issues']['jump'] == day
+        elif day == 3:
+            # The third agreeing jump confirms the shift: all three rows are accepted
+            assert report['issues'] == {'level_shift': 3}
+        else:
+            assert report['issues'] == {}
+
+    pd.testing.assert_frame_equal(store.load('^GSPC'), pd.concat([existing, feed]), check_freq=False)
+    assert (store.load(DeltaValidator.quarantine_key('^GSPC'))['Reason'] == 'jump').sum() == 3
+
+
+def test_fetch_and_update_merges_only_validated_rows(clean_cache):
+    store = ParquetStore(cache_dir=clean_cache)
+    existing = _stored_history()
+    store.save(existing, '^GSPC')
+    next_session = XNYS.next_session(existing.index[-1])
+    adapter = MagicMock()
+    adapter.get_data.return_value = pd.DataFrame(
+        {'^GSPC': [0.0, existing['^GSPC'].iloc[-1]]},
+        index=pd.DatetimeIndex([next_session, XNYS.next_session(next_session)]),
+    )
+
+    validator = DeltaValidator(store, {'^GSPC': QualityRules(calendar=XNYS)})
+    result = fetch_and_update('^GSPC', adapter, store, '2000-01-01', validator=validator)
+
+    assert len(result) == len(existing) + 1
+    assert (result['^GSPC'] > 0).all()
+    assert store.load(DeltaValidator.quarantine_key('^GSPC')).index[0] == next_session
+
+
+# --- Test Transport ---
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Replies with the next scripted status; 200s carry an ETag and honour If-None-Match."""
+    script = []
+    seen = []
+
+    def do_GET(self):
+        self.seen.append(dict(self.headers))
+        status = self.script.pop(0) if self.script else 200
+        if status == 200 and self.headers.get('If-None-Match') == '"v1"':
+            status = 304
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '2')
+        if status in (200, 304):
+            self.send_header('ETag', '"v1"')
+        body = b"DATE,X\n2024-01-02,1.5\n" if status == 200 else b""
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    _StubHandler.script, _StubHandler.seen = [], []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/series.csv"
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_bucket_paces_after_burst():
+    now = [0.0]
+    waits = []
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=waits.append)
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    now[0] = 10.0
+    assert bucket.acquire() == 0.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:05 GMT', now=1445412480.0) == 5.0
+    assert parse_retry_after(None) is None
+
+
+def test_transport_call_retries_transient_errors_only():
+    sleeps = []
+    transport = Transport(default_rate_limit=(1000.0, 10.0), policy=RetryPolicy(max_retries=3), sleep=sleeps.append)
+
+    outcomes = [requests.ConnectionError(), requests.Timeout(), 'ok']
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    assert transport.call('example.com', flaky) == 'ok'
+    assert len(sleeps) == 2
+
+    # Programming errors are not retried
+    calls = []
+    def broken():
+        calls.append(1)
+        raise KeyError('Close')
+    with pytest.raises(KeyError):
+        transport.call('example.com', broken)
+    assert len(calls) == 1
+
+    # Retryable statuses of returned responses are, honouring Retry-After
+    responses = [MagicMock(status_code=429, headers={'Retry-After': '4'}), MagicMock(status_code=200, headers={})]
+    assert transport.call('example.com', lambda: responses.pop(0)).status_code == 200
+    assert sleeps[-1] == 4.0
+
+
+def test_transport_retries_and_revalidates(stub_server, clean_cache):
+    sleeps = []
+    transport = Transport(default_rate_limit=(1000.0, 10.0), policy=RetryPolicy(max_retries=3),
+                          cache_dir=clean_cache, sleep=sleeps.append)
+
+    # 429 (Retry-After: 2) then 503 then success
+    _StubHandler.script = [429, 503, 200]
+    response = transport.session.get(stub_server)
+    assert response.status_code == 200
+    assert sleeps[0] == 2.0 and len(sleeps) == 2
+
+    # Same URL from a fresh transport: served from the persisted body after a 304
+    transport = Transport(default_rate_limit=(1000.0, 10.0), cache_dir=clean_cache, sleep=sleeps.append)
+    response = transport.session.get(stub_server)
+    assert _StubHandler.seen[-1].get('If-None-Match') == '"v1"'
+    assert response.status_code == 200
+    assert response.text.startswith("DATE,X")
+
+    # Retries exhausted: the last error response is returned
+    _StubHandler.script = [503] * 10
+    transport = Transport(default_rate_limit=(1000.0, 10.0), policy=RetryPolicy(max_retries=2), sleep=sleeps.append)
+    assert transport.session.get(stub_server).status_code == 503
+
+
+def test_conditional_cache_evicts_least_recently_used(clean_cache):
+    def url(day):
+        return f"https://fred.example/graph.csv?id=X&cosd=2024-01-0{day}"
+
+    def put(cache, day):
+        r = requests.Response()
+        r.status_code, r._content = 200, b"%d" % day
+        r.headers['ETag'] = '"v1"'
+        cache.put(url(day), r)
+        os.utime(cache._paths(url(day))[0], (day, day)) # Deterministic write order
+
+    # One URL per run, as for a FRED range whose start date moves
+    cache = ConditionalCache(clean_cache, max_entries=3)
+    for day in (1, 2, 3):
+        put(cache, day)
+    # Revalidating the oldest entry (from disk) marks it recently used
+    assert ConditionalCache(clean_cache, max_entries=3).get(url(1))["content"] == b"1"
+    for day in (4, 5):
+        put(cache, day)
+
+    assert len(os.listdir(clean_cache)) == 6 # Three entries, meta and body each
+    fresh = ConditionalCache(clean_cache, max_entries=3)
+    assert [day for day in range(1, 6) if fresh.get(url(day))] == [1, 4, 5]
+    assert len(cache._entries) == 3
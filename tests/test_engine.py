@@ -0,0 +1,191 @@
+import pandas as pd
+import pytest
+from market_monitor.core.engine import Engine, Stage, content_hash
+
+def _pipeline(calls, source_value, scale=2):
+    def source():
+        calls.append('source')
+        return source_value
+
+    def double(source, factor):
+        calls.append('double')
+        return source * factor
+
+    def total(double):
+        calls.append('total')
+        return double.sum()
+
+    def label(source):
+        calls.append('label')
+        return f"{len(source)} rows"
+
+    return [
+        Stage('source', source, cache=False),
+        Stage('double', double, deps=['source'], params={'factor': scale}),
+        Stage('total', total, deps=['double']),
+        Stage('label', label, deps=['source']),
+    ]
+
+def test_rerun_short_circuits_to_cached_target(tmp_path):
+    data = pd.Series([1.0, 2.0, 3.0])
+
+    calls = []
+    assert Engine(_pipeline(calls, data), str(tmp_path)).run('total') == 12.0
+    assert calls == ['source', 'double', 'total']
+
+    calls = []
+    engine = Engine(_pipeline(calls, data), str(tmp_path))
+    assert engine.run('total') == 12.0
+    # Only the uncached source runs; 'double' is resolved by hash without loading
+    assert calls == ['source']
+    assert engine.trace['double'].status == 'hit'
+    assert not engine.trace['double'].loaded
+    assert engine.trace['total'].loaded
+
+def test_only_dependent_stages_rerun(tmp_path):
+    data = pd.Series([1.0, 2.0, 3.0])
+    Engine(_pipeline([], data), str(tmp_path)).run('total')
+    Engine(_pipeline([], data), str(tmp_path)).run('label')
+
+    # Parameter change invalidates 'double' and 'total', not 'label'
+    calls = []
+    engine = Engine(_pipeline(calls, data, scale=3), str(tmp_path))
+    assert engine.run('total') == 18.0
+    assert engine.run('label') == "3 rows"
+    assert calls == ['source', 'double', 'total']
+
+    # Input change invalidates everything downstream of the source
+    calls = []
+    engine = Engine(_pipeline(calls, pd.Series([1.0, 2.0, 4.0]), scale=3), str(tmp_path))
+    engine.run('total')
+    assert calls == ['source', 'double', 'total']
+    assert 'double' in engine.explain()
+
+def test_variants_coexist_when_parameters_alternate(tmp_path):
+    data = pd.Series([1.0, 2.0, 3.0])
+    Engine(_pipeline([], data, scale=2), str(tmp_path)).run('total')
+    Engine(_pipeline([], data, scale=3), str(tmp_path)).run('total')
+
+    # Switching back and forth hits the stored variant each time
+    for scale, expected in [(2, 12.0), (3, 18.0), (2, 12.0)]:
+        calls = []
+        engine = Engine(_pipeline(calls, data, scale=scale), str(tmp_path))
+        assert engine.run('total') == expected
+        assert calls == ['source']
+        assert engine.trace['double'].status == 'hit'
+
+    # Only the most recently used variants are kept
+    for scale in (4, 5):
+        Engine(_pipeline([], data, scale=scale), str(tmp_path), max_variants=3).run('total')
+    manifest = Engine(_pipeline([], data), str(tmp_path)).manifest
+    assert len(manifest['double']) == 3
+    assert len(list(tmp_path.glob('double-*.pkl'))) == 3
+    calls = []
+    Engine(_pipeline(calls, data, scale=2), str(tmp_path)).run('total') # Used last in the loop above
+    assert calls == ['source']
+    calls = []
+    Engine(_pipeline(calls, data, scale=3), str(tmp_path)).run('total') # Evicted
+    assert calls == ['source', 'double', 'total']
+
+def test_stream_yields_before_stage_finishes(tmp_path):
+    calls = []
+
+    def items(source):
+        for value in source:
+            calls.append(value)
+            yield value * 10
+
+    def stages():
+        return [
+            Stage('source', lambda: [1, 2, 3], cache=False),
+            Stage('items', items, deps=['source'], stream=True),
+        ]
+
+    stream = Engine(stages(), str(tmp_path)).stream('items')
+    assert next(stream) == 10
+    assert calls == [1] # Later items are not produced yet
+    assert list(stream) == [20, 30]
+
+    # The list is cached once the stream is exhausted
+    calls.clear()
+    engine = Engine(stages(), str(tmp_path))
+    assert list(engine.stream('items')) == [10, 20, 30]
+    assert engine.run('items') == [10, 20, 30]
+    assert calls == []
+    assert engine.trace['items'].status == 'hit'
+
+def test_engine_rejects_cycles(tmp_path):
+    stages = [
+        Stage('a', lambda b: b, deps=['b']),
+        Stage('b', lambda a: a, deps=['a']),
+    ]
+    with pytest.raises(ValueError):
+        Engine(stages, str(tmp_path))
+
+def test_content_hash_tracks_values_and_index():
+    df = pd.DataFrame({'SPX': [1.0, 2.0]}, index=pd.to_datetime(['2020-01-01', '2020-01-02']))
+    assert content_hash(df) == content_hash(df.copy())
+    assert content_hash(df) != content_hash(df * 2)
+    assert content_hash(df) != content_hash(df.set_axis(pd.to_datetime(['2020-01-02', '2020-01-03'])))
+
+def _offline_store(path):
+    import numpy as np
+    from market_monitor.data.store import ParquetStore
+
+    store = ParquetStore(cache_dir=str(path / "store"))
+    dates = pd.bdate_range('2015-01-01', periods=600)
+    rng = np.random.default_rng(3)
+    store.save(pd.DataFrame({'^GSPC': 2000 * np.exp(np.cumsum(rng.normal(0, 0.01, 600)))}, index=dates), '^GSPC')
+    store.save(pd.DataFrame({'^VIX': rng.uniform(10, 30, 600)}, index=dates), '^VIX')
+    store.save(pd.DataFrame({'T10Y3M': rng.uniform(-1, 2, 600)}, index=dates), 'T10Y3M')
+    store.save(pd.DataFrame({'USREC': np.zeros(600)}, index=dates), 'USREC')
+    return store
+
+def test_app_reads_weekly_bars_offline(tmp_path):
+    from market_monitor.core.app import MarketMonitorApp
+    from market_monitor.data.resample import ResampleCache
+
+    store = _offline_store(tmp_path)
+    app = MarketMonitorApp(store, offline=True, frequency='weekly')
+    text = app.run(show=False)
+    weekly = app.engine.run('analytics')
+    cache = ResampleCache(store)
+    bars = cache.load('^GSPC', 'weekly')
+
+    assert "Weekly Return:" in text
+    assert len(weekly) == len(bars) - 1 # First bar has no return
+    pd.testing.assert_series_equal(weekly['SPX'], bars['Close'].iloc[1:], check_names=False, check_freq=False)
+    assert app.engine.run('lifetime')['lifetime_mad'] == pytest.approx(cache.stats('^GSPC', 'weekly')['lifetime_mad'])
+
+def test_app_alternating_frequencies_hit_the_cache(tmp_path):
+    from market_monitor.core.app import MarketMonitorApp
+
+    store = _offline_store(tmp_path)
+    texts = {freq: MarketMonitorApp(store, offline=True, frequency=freq).run(show=False)
+             for freq in ('daily', 'weekly')}
+
+    for freq in ('daily', 'weekly', 'daily', 'weekly'):
+        app = MarketMonitorApp(store, offline=True, frequency=freq)
+        assert app.run(show=False) == texts[freq]
+        assert app.engine.trace['report'].status == 'hit'
+        assert not app.engine.trace['analytics'].loaded # Resolved by hash alone
+
+def test_app_emits_one_record_per_ticker(tmp_path):
+    import io
+    import json
+    import numpy as np
+    from market_monitor.core.app import MarketMonitorApp
+    from market_monitor.ui.reporter import JsonLinesReporter
+
+    store = _offline_store(tmp_path)
+    app = MarketMonitorApp(store, offline=True)
+    out = io.StringIO()
+    assert app.run(show=False, reporter=JsonLinesReporter(out)) is None
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row['ticker'] for row in rows] == ['^GSPC', '^VIX']
+    vix = store.load('^VIX')['^VIX']
+    assert rows[1]['level'] == pytest.approx(vix.iloc[-1])
+    assert rows[1]['log_return'] == pytest.approx(np.log(vix.iloc[-1] / vix.iloc[-2]))
+    # The text report is not built for a reporter
+    assert 'report       skipped' in app.explain()
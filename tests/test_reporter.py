@@ -0,0 +1,64 @@
+import io
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from market_monitor.ui.reporter import (
+    ArrowStreamReporter, JsonLinesReporter, ReportRecord, TextReporter, format_report, read_arrow_report,
+)
+
+def _frame(last_return=-0.09):
+    dates = pd.bdate_range('2024-01-01', periods=5)
+    return pd.DataFrame({
+        'SPX': [4700.0, 4710.0, 4690.0, 4720.0, 4300.0],
+        'VIX': [13.0, 12.5, 14.0, 13.2, 38.0],
+        'Slope': [-1.2, -1.1, -1.0, np.nan, -0.9],
+        'Log_Return': [np.nan, 0.002, -0.004, 0.006, last_return],
+        'Drawdown': [0.0, 0.0, -0.004, 0.0, -0.089],
+    }, index=dates)
+
+def _records():
+    df = _frame()
+    return [
+        ReportRecord.from_frame(df, 0.011, 0.008, ticker='^GSPC'),
+        ReportRecord.from_frame(df.iloc[:-1], 0.011, 0.008, ticker='^GSPC', frequency='weekly'),
+    ]
+
+def test_record_fields_and_tier():
+    record = _records()[0]
+    assert record.date == pd.Timestamp('2024-01-05')
+    assert record.tier == -10 # -0.09 / 0.008 = -11.25 MAD
+    assert record.mad_move == -0.09 / 0.008
+    assert record.simple_return == np.exp(-0.09) - 1
+
+def test_text_reporter_matches_console_report():
+    out = io.StringIO()
+    TextReporter(out).emit(_records()[0])
+    assert out.getvalue() == format_report(_frame(), -0.09 / 0.011, -0.09 / 0.008, 0.011, 0.008) + "\n"
+
+def test_jsonl_reporter_flushes_each_record():
+    out = io.StringIO()
+    reporter = JsonLinesReporter(out)
+    first, second = _records()
+    reporter.emit(first)
+    assert json.loads(out.getvalue())['tier'] == -10 # Already written before close
+    reporter.emit(second)
+    reporter.close()
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows[1]['slope'] is None # NaN -> null
+    assert rows[1]['date'] == '2024-01-04'
+
+def test_arrow_stream_round_trip(tmp_path):
+    path = str(tmp_path / "report.arrows")
+    with ArrowStreamReporter(path) as reporter:
+        for record in _records():
+            reporter.emit(record)
+
+    table = read_arrow_report(path)
+    assert table.num_rows == 2
+    assert table.column('tier').to_pylist() == [-10, 0]
+    assert table.column('frequency').to_pylist() == ['daily', 'weekly']
+    # One batch per ticker
+    with pa.memory_map(path) as source:
+        assert len(list(pa.ipc.open_stream(source))) == 2
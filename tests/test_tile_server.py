@@ -0,0 +1,92 @@
+import json
+import threading
+import urllib.request
+import numpy as np
+import pandas as pd
+import pytest
+from market_monitor.ui.tile_server import TilePyramid, TileServer
+
+@pytest.fixture
+def history():
+    dates = pd.bdate_range('1985-01-01', '1990-12-31')
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(index=dates)
+    df['Log_Return'] = rng.normal(0, 0.01, size=len(dates))
+    df.loc['1987-10-19', 'Log_Return'] = -0.229 # Black Monday
+    df['SPX'] = 100 * np.exp(df['Log_Return'].cumsum())
+    return df
+
+def test_update_matches_full_build(history):
+    split = history.index.get_loc(pd.Timestamp('1990-06-13'))
+
+    incremental = TilePyramid(tracks=['SPX', 'Log_Return'])
+    incremental.build(history.iloc[:split], lifetime_mad=0.008)
+    incremental.update(history, lifetime_mad=0.008)
+
+    full = TilePyramid(tracks=['SPX', 'Log_Return'])
+    full.build(history, lifetime_mad=0.008)
+
+    for track in ['SPX', 'Log_Return']:
+        for level in full.levels:
+            pd.testing.assert_frame_equal(
+                incremental.pyramid[track][level], full.pyramid[track][level], check_freq=False
+            )
+
+def test_saved_pyramid_is_updated_after_load(history, tmp_path):
+    split = history.index.get_loc(pd.Timestamp('1990-06-13'))
+    directory = str(tmp_path / "tiles")
+
+    assert TilePyramid.load(directory).last_timestamp is None
+    first_run = TilePyramid(tracks=['SPX', 'Log_Return'])
+    first_run.update(history.iloc[:split], lifetime_mad=0.008) # Nothing stored: full build
+    first_run.save(directory)
+
+    second_run = TilePyramid.load(directory, tracks=['SPX', 'Log_Return'])
+    assert second_run.last_timestamp == history.index[split - 1]
+    second_run.update(history, lifetime_mad=0.008)
+
+    full = TilePyramid(tracks=['SPX', 'Log_Return'])
+    full.build(history, lifetime_mad=0.008)
+    for track in ['SPX', 'Log_Return']:
+        for level in full.levels:
+            pd.testing.assert_frame_equal(
+                second_run.pyramid[track][level], full.pyramid[track][level], check_freq=False
+            )
+    pd.testing.assert_frame_equal(second_run.outliers, full.outliers, check_freq=False)
+
+def test_query_picks_level_within_budget_and_keeps_outliers(history):
+    pyramid = TilePyramid(tracks=['Log_Return'])
+    pyramid.build(history, lifetime_mad=0.008)
+
+    # Whole history at <= 100 points -> monthly (72 buckets)
+    overview = pyramid.query('Log_Return', max_points=100)
+    assert overview['level'] == 'monthly'
+    assert len(overview['t']) == 72
+
+    # Zoom into October 1987 -> daily buckets, and the crash at full resolution
+    zoom = pyramid.query('Log_Return', pd.Timestamp('1987-10-01'), pd.Timestamp('1987-10-31'), max_points=100)
+    assert zoom['level'] == 'daily'
+    assert '1987-10-19T00:00:00' in zoom['outliers']['t']
+    assert -10 in zoom['outliers']['tier']
+
+def test_tile_server_serves_viewport(history):
+    pyramid = TilePyramid(tracks=['SPX'])
+    pyramid.build(history, lifetime_mad=0.008)
+    server = TileServer(pyramid, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"{server.address}/tiles?track=SPX&start=1987-01-01&end=1987-12-31&max_points=60"
+        with urllib.request.urlopen(url) as response:
+            payload = json.loads(response.read())
+        assert payload['level'] == 'weekly'
+        # The week containing 1987-01-01 starts on Saturday 1986-12-27
+        assert payload['t'][0] == '1986-12-27T00:00:00'
+        assert len(payload['t']) == 53
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(f"{server.address}/tiles?track=NOPE")
+        with excinfo.value as error:
+            assert error.code == 404
+    finally:
+        server.shutdown()
@@ -2,6 +2,7 @@ import pytest
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 from unittest.mock import patch, MagicMock
 from market_monitor.ui.dashboard import MatplotlibDashboard
 
@@ -40,5 +41,96 @@ def test_dashboard_render_smoke():
     # Close figures to avoid memory leaks
     plt.close('all')
 
+def _live_frame(n=300):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(start='2020-01-01', periods=n)
+    df = pd.DataFrame(index=dates)
+    df['SPX'] = 3000 * np.exp(np.cumsum(rng.normal(0, 0.005, size=n)))
+    df['VIX'] = rng.uniform(10, 30, size=n)
+    df['Slope'] = rng.uniform(-1, 2, size=n)
+    df['Recession'] = 0.0
+    df['Log_Return'] = rng.normal(0, 0.01, size=n)
+    df['Drawdown'] = df['SPX'] / df['SPX'].cummax() - 1
+    return df
+
+
+def test_live_dashboard_blits_new_rows():
+    """New rows within the axis limits are blitted onto the cached background."""
+    from market_monitor.ui.live_dashboard import LiveDashboard
+
+    df = _live_frame()
+    history, latest = df.iloc[:-3], df.iloc[:-2]
+    context = {'lifetime_mad': 0.008}
+
+    dashboard = LiveDashboard(headroom=0.05)
+    dashboard.render(history, context)
+    assert dashboard.full_redraws == 1
+
+    with patch.object(dashboard.fig.canvas, 'blit') as mock_blit:
+        assert dashboard.update(latest, context) == 'blit'
+        mock_blit.assert_called_once()
+    assert dashboard.update(latest, context) == 'noop'
+
+    # An outlier within the axis range is classified and drawn incrementally
+    extended = df.copy()
+    extended.iloc[-1, extended.columns.get_loc('Log_Return')] = 0.9 * dashboard.axes[2].get_ylim()[1]
+    assert dashboard.update(extended, {'lifetime_mad': 0.00801}) == 'blit'
+    assert dashboard.full_redraws == 1
+
+    plt.close('all')
+
+
+def test_live_dashboard_reuses_artists():
+    """Blitting many rows neither adds artists nor slows the next full canvas draw."""
+    from market_monitor.ui.live_dashboard import LiveDashboard
+
+    df = _live_frame()
+    df.iloc[-50:] = df.iloc[100:150].to_numpy() # Values within the rendered limits
+    context = {'lifetime_mad': 0.008}
+    dashboard = LiveDashboard(headroom=0.5)
+    dashboard.render(df.iloc[:-50], context)
+    children = sum(len(ax.get_children()) for ax in dashboard.fig.axes)
+
+    for end in range(len(df) - 49, len(df) + 1):
+        assert dashboard.update(df.iloc[:end], context) == 'blit'
+    assert sum(len(ax.get_children()) for ax in dashboard.fig.axes) == children
+
+    # A full canvas draw (e.g. a resize) repaints all 50 blitted rows with the fixed history layers
+    with patch.object(dashboard.fig, 'draw_artist', wraps=dashboard.fig.draw_artist) as mock_draw:
+        dashboard.fig.canvas.draw()
+    assert mock_draw.call_count == len(dashboard._history.artists)
+    np.testing.assert_array_equal(dashboard._history.spx.get_xdata(),
+                                  mdates.date2num(df.index[-51:]))
+    assert sum(len(dots.get_offsets()) for dots in dashboard._history.dots.values()) == 50
+
+    plt.close('all')
+
+
+def test_live_dashboard_full_redraw_triggers():
+    """Moved MAD thresholds or out-of-range values force a full redraw."""
+    from market_monitor.ui.live_dashboard import LiveDashboard
+
+    df = _live_frame()
+    dashboard = LiveDashboard(headroom=0.05, mad_tolerance=0.01)
+    dashboard.render(df.iloc[:-10], {'lifetime_mad': 0.008})
+
+    # MAD moved by 5%
+    assert dashboard.update(df.iloc[:-9], {'lifetime_mad': 0.0084}) == 'full'
+    assert dashboard.full_redraws == 2
+
+    # Return beyond the y limits of the returns track
+    spiked = df.iloc[:-8].copy()
+    spiked.iloc[-1, spiked.columns.get_loc('Log_Return')] = 10 * dashboard.axes[2].get_ylim()[1]
+    assert dashboard.update(spiked, {'lifetime_mad': 0.0084}) == 'full'
+
+    # A date past the x-axis headroom
+    later = df.iloc[:-7].copy()
+    later.index = later.index[:-1].append(pd.DatetimeIndex([later.index[-1] + pd.Timedelta(days=365)]))
+    assert dashboard.update(later, {'lifetime_mad': 0.0084}) == 'full'
+    assert dashboard.full_redraws == 4
+
+    plt.close('all')
+
+
 if __name__ == "__main__":
     test_dashboard_render_smoke()